@@ -40,6 +40,7 @@ INSTALLED_APPS = [
     'corsheaders',
 
     'django.contrib.admin',
+    'django.contrib.postgres',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -123,6 +124,40 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# The jobs API caches encoded responses under the current data version
+# (see jobs/cache.py). Local memory by default; set REDIS_URL (needs the
+# redis package) or CACHE_DIR in production so workers share entries.
+
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+elif os.getenv('CACHE_DIR'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('CACHE_DIR'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+
+# Similar-jobs index (jobs/similarity.py), refreshed by
+# `python manage.py build_similarity_index` after each scraper run.
+
+SIMILARITY_INDEX_DIR = os.getenv('SIMILARITY_INDEX_DIR', str(BASE_DIR / 'similarity_index'))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
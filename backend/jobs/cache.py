@@ -0,0 +1,150 @@
+import hashlib
+from functools import wraps
+from asgiref.sync import iscoroutinefunction
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, quote_etag
+from django.utils.http import http_date
+from .models import DataVersion
+
+# Entries are keyed on the data version, so an ingest invalidates them all in
+# O(1) and the timeout only bounds how long superseded versions linger.
+RESPONSE_CACHE_TIMEOUT = 60 * 60 * 24  # seconds
+
+HITS_KEY = 'jobs:cache:hits'
+MISSES_KEY = 'jobs:cache:misses'
+
+
+def data_version(request):
+    """Returns the current DataVersion, read at most once per request."""
+    if not hasattr(request, '_jobs_data_version'):
+        request._jobs_data_version = DataVersion.current()
+    return request._jobs_data_version
+
+
+async def adata_version(request):
+    """Async counterpart of data_version()."""
+    if not hasattr(request, '_jobs_data_version'):
+        request._jobs_data_version = await DataVersion.acurrent()
+    return request._jobs_data_version
+
+
+def _count(key, delta=1):
+    if not delta:
+        return
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        # Evicted between add() and incr(); losing one tick is fine
+        pass
+
+
+def record_lookups(hits=0, misses=0):
+    _count(HITS_KEY, hits)
+    _count(MISSES_KEY, misses)
+
+
+async def _acount(key, delta=1):
+    if not delta:
+        return
+    await cache.aadd(key, 0, timeout=None)
+    try:
+        await cache.aincr(key, delta)
+    except ValueError:
+        pass
+
+
+async def arecord_lookups(hits=0, misses=0):
+    await _acount(HITS_KEY, hits)
+    await _acount(MISSES_KEY, misses)
+
+
+def cache_stats():
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    lookups = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / lookups, 4) if lookups else None,
+    }
+
+
+def response_cache_key(path, version):
+    """Cache key of the response body served at `path` (including the query string)."""
+    digest = hashlib.md5(path.encode()).hexdigest()
+    return f"jobs:response:v{version}:{digest}"
+
+
+def cached_json_response(view_func):
+    """
+    Serves the view's encoded JSON body from the cache while the jobs data
+    version is unchanged. Only 200 responses are stored. Wraps both sync
+    and async views.
+    """
+    def _hit(content):
+        response = HttpResponse(content, content_type='application/json')
+        response['X-Cache'] = 'HIT'
+        return response
+
+    if iscoroutinefunction(view_func):
+        async def wrapped(request, *args, **kwargs):
+            key = response_cache_key(request.get_full_path(), (await adata_version(request)).version)
+            content = await cache.aget(key)
+            if content is not None:
+                await arecord_lookups(hits=1)
+                return _hit(content)
+
+            await arecord_lookups(misses=1)
+            response = await view_func(request, *args, **kwargs)
+            if response.status_code == 200:
+                await cache.aset(key, response.content, RESPONSE_CACHE_TIMEOUT)
+            response['X-Cache'] = 'MISS'
+            return response
+    else:
+        def wrapped(request, *args, **kwargs):
+            key = response_cache_key(request.get_full_path(), data_version(request).version)
+            content = cache.get(key)
+            if content is not None:
+                record_lookups(hits=1)
+                return _hit(content)
+
+            record_lookups(misses=1)
+            response = view_func(request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response.content, RESPONSE_CACHE_TIMEOUT)
+            response['X-Cache'] = 'MISS'
+            return response
+
+    return wraps(view_func)(wrapped)
+
+
+def revalidated(etag_func, last_modified_func):
+    """
+    Async counterpart of django.views.decorators.http.condition(): the
+    validator functions are coroutines, so they can query the database from
+    an async view. Answers If-None-Match/If-Modified-Since with a 304 before
+    the view runs, and marks responses no-cache so clients always revalidate.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        async def wrapped(request, *args, **kwargs):
+            etag = await etag_func(request, *args, **kwargs)
+            etag = quote_etag(etag) if etag is not None else None
+            last_modified = await last_modified_func(request, *args, **kwargs)
+            last_modified = int(last_modified.timestamp()) if last_modified else None
+
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = await view_func(request, *args, **kwargs)
+
+            if request.method in ('GET', 'HEAD'):
+                if last_modified and not response.has_header('Last-Modified'):
+                    response.headers['Last-Modified'] = http_date(last_modified)
+                if etag:
+                    response.headers.setdefault('ETag', etag)
+            patch_cache_control(response, no_cache=True)
+            return response
+        return wrapped
+    return decorator
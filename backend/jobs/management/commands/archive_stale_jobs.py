@@ -0,0 +1,57 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from jobs.models import ArchivedJob, DataVersion
+
+# Every ArchivedJob column except archived_at is copied from jobs_job as is
+ARCHIVED_COLUMNS = ', '.join(
+    field.column for field in ArchivedJob._meta.concrete_fields if field.name != 'archived_at'
+)
+
+# One statement per batch: the batch is picked once, skipping rows a scraper
+# holds, and the same ids are unlinked, deleted and inserted into the archive.
+# Duplicates of an archived job lose their canonical; the next ingest that
+# still sees them links them again. Duplicates archived in the same batch are
+# left to the DELETE, as a statement cannot modify a row twice.
+MOVE_SQL = f"""
+WITH batch AS (
+    SELECT id FROM jobs_job WHERE last_seen_at < %s ORDER BY id LIMIT %s FOR UPDATE SKIP LOCKED
+), unlinked AS (
+    UPDATE jobs_job SET canonical_job_id = NULL
+    WHERE canonical_job_id IN (SELECT id FROM batch) AND id NOT IN (SELECT id FROM batch)
+), moved AS (
+    DELETE FROM jobs_job WHERE id IN (SELECT id FROM batch)
+    RETURNING {ARCHIVED_COLUMNS}
+)
+INSERT INTO jobs_archivedjob ({ARCHIVED_COLUMNS}, archived_at)
+SELECT {ARCHIVED_COLUMNS}, NOW() FROM moved
+"""
+
+
+class Command(BaseCommand):
+    help = "Moves jobs not seen by any scraper for --days days from jobs_job to jobs_archivedjob."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=14)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        params = (cutoff, options['batch_size'])
+        archived = 0
+        while True:
+            # Short transactions so the scrapers' upserts are never blocked for long
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(MOVE_SQL, params)
+                moved = cursor.rowcount
+            if not moved:
+                break
+            archived += moved
+            self.stdout.write(f"Archived {archived} jobs")
+
+        if archived:
+            DataVersion.bump()
+        self.stdout.write(self.style.SUCCESS(f"Done, {archived} jobs last seen before {cutoff:%Y-%m-%d} archived."))
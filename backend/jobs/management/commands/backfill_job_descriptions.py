@@ -0,0 +1,81 @@
+import json
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from jobs.models import DataVersion, Job
+
+# Descriptions are sanitized by the scrapers at ingest; this brings older rows in line
+sys.path.insert(0, str(settings.BASE_DIR.parent / 'scraper'))
+from db import CONTENT_FIELDS, content_hash  # noqa: E402
+from dedup import lsh_buckets, minhash_signature  # noqa: E402
+from normalize import clean_description, make_snippet  # noqa: E402
+
+DESCRIPTION_FIELDS = ('description', 'description_text', 'snippet', 'content_hash', 'minhash', 'lsh_buckets')
+
+
+class Command(BaseCommand):
+    help = (
+        "Sanitizes the description HTML of existing jobs and stores its plain text and snippet, "
+        "as the scrapers do at ingest."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        last_id = 0
+        scanned = 0
+        updated = 0
+        bytes_before = 0
+        bytes_after = 0
+        while True:
+            # Walk the primary key so every batch is an index range scan
+            rows = list(
+                Job.objects.filter(id__gt=last_id)
+                .order_by('id')
+                .values('id', 'description_text', 'snippet', *CONTENT_FIELDS)[:options['batch_size']]
+            )
+            if not rows:
+                break
+
+            # bulk_update() skips auto_now, and the detail ETag is built from updated_at
+            now = timezone.now()
+            jobs = []
+            for row in rows:
+                description, text = clean_description(row['description'])
+                snippet = make_snippet(text)
+                bytes_before += len(row['description'].encode())
+                bytes_after += len(description.encode())
+                # Rows already written by a sanitizing scrape come out the same
+                if (description, text, snippet) == (row['description'], row['description_text'], row['snippet']):
+                    continue
+                # Hashed as the scrapers' upsert hashes it, with tags as their JSON text
+                job = {**row, 'description': description, 'tags': json.dumps(row['tags'])}
+                signature = minhash_signature(row['title'], row['company'], text)
+                jobs.append(Job(
+                    id=row['id'],
+                    description=description,
+                    description_text=text,
+                    snippet=snippet,
+                    content_hash=content_hash(job),
+                    minhash=signature,
+                    lsh_buckets=lsh_buckets(signature),
+                    updated_at=now,
+                ))
+            Job.objects.bulk_update(jobs, DESCRIPTION_FIELDS + ('updated_at',))
+            scanned += len(rows)
+            updated += len(jobs)
+            last_id = rows[-1]['id']
+            self.stdout.write(f"Sanitized {updated} of {scanned} jobs (up to id {last_id})")
+
+        if updated:
+            DataVersion.bump()
+        saved = bytes_before - bytes_after
+        share = saved / bytes_before if bytes_before else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Done, {updated} jobs updated; descriptions take {bytes_after} bytes instead of "
+            f"{bytes_before} ({share:.0%} less)."
+        ))
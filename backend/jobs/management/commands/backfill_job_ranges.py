@@ -0,0 +1,51 @@
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from jobs.models import DataVersion, Job
+
+# The parsers live with the scrapers, which apply them at ingest
+sys.path.insert(0, str(settings.BASE_DIR.parent / 'scraper'))
+from normalize import parse_experience, parse_pay  # noqa: E402
+
+RANGE_FIELDS = (
+    'pay_min', 'pay_max', 'pay_currency', 'pay_period', 'pay_yearly_min', 'pay_yearly_max',
+    'experience_min', 'experience_max',
+)
+
+
+class Command(BaseCommand):
+    help = "Parses pay and experience of existing jobs into the structured range columns."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        last_id = 0
+        updated = 0
+        while True:
+            # Walk the primary key so every batch is an index range scan
+            rows = list(
+                Job.objects.filter(id__gt=last_id)
+                .order_by('id')
+                .values_list('id', 'pay', 'experience')[:options['batch_size']]
+            )
+            if not rows:
+                break
+
+            # bulk_update() skips auto_now, and the detail ETag is built from updated_at
+            now = timezone.now()
+            jobs = [
+                Job(id=job_id, updated_at=now, **parse_pay(pay), **parse_experience(experience))
+                for job_id, pay, experience in rows
+            ]
+            Job.objects.bulk_update(jobs, RANGE_FIELDS + ('updated_at',))
+            updated += len(jobs)
+            last_id = rows[-1][0]
+            self.stdout.write(f"Backfilled {updated} jobs (up to id {last_id})")
+
+        if updated:
+            DataVersion.bump()
+        self.stdout.write(self.style.SUCCESS(f"Done, {updated} jobs backfilled."))
@@ -0,0 +1,123 @@
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from jobs.models import DataVersion, Job
+
+# The dedup stage lives with the scrapers, which apply it at ingest
+sys.path.insert(0, str(settings.BASE_DIR.parent / 'scraper'))
+from dedup import canonicalize_url, link_near_duplicates, lsh_buckets, minhash_signature  # noqa: E402
+
+# Folds a job whose link canonicalizes to an existing job's link into that
+# job: the survivor keeps the earliest sighting and the latest one, and the
+# duplicates pointing at the folded job point at the survivor instead.
+MERGE_SQL = """
+UPDATE jobs_job AS survivor SET
+    created_at = LEAST(survivor.created_at, folded.created_at),
+    first_seen_at = LEAST(survivor.first_seen_at, folded.first_seen_at),
+    last_seen_at = GREATEST(survivor.last_seen_at, folded.last_seen_at),
+    updated_at = %(now)s
+FROM jobs_job AS folded
+WHERE survivor.id = %(survivor)s AND folded.id = %(folded)s;
+
+UPDATE jobs_job SET canonical_job_id = NULLIF(%(survivor)s, id) WHERE canonical_job_id = %(folded)s;
+
+DELETE FROM jobs_job WHERE id = %(folded)s;
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Canonicalizes the apply links of existing jobs, computes their MinHash signatures "
+        "and links their near-duplicates."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--all', action='store_true', help="Recompute jobs that already have a signature.")
+
+    def canonicalize_links(self, batch_size):
+        """
+        Rewrites apply links to dedup.canonicalize_url(), as the scrapers now
+        store them, so their upserts hit the existing rows instead of
+        inserting a second one. A job whose canonical link is already taken
+        is merged into the job holding it.
+
+        Returns:
+            tuple: (links rewritten, jobs merged)
+        """
+        last_id = 0
+        rewritten = 0
+        merged = 0
+        while True:
+            rows = list(
+                Job.objects.filter(id__gt=last_id).order_by('id').values_list('id', 'apply_link')[:batch_size]
+            )
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            changed = {}
+            for job_id, apply_link in rows:
+                canonical = canonicalize_url(apply_link)
+                if canonical != apply_link:
+                    changed[job_id] = canonical
+            if not changed:
+                continue
+
+            now = timezone.now()
+            with transaction.atomic(), connection.cursor() as cursor:
+                holders = dict(
+                    Job.objects.filter(apply_link__in=set(changed.values())).values_list('apply_link', 'id')
+                )
+                renames = []
+                for job_id, canonical in changed.items():
+                    survivor = holders.get(canonical)
+                    if survivor is None:
+                        holders[canonical] = job_id
+                        renames.append(Job(id=job_id, apply_link=canonical, updated_at=now))
+                    else:
+                        cursor.execute(MERGE_SQL, {'survivor': survivor, 'folded': job_id, 'now': now})
+                        merged += 1
+                Job.objects.bulk_update(renames, ('apply_link', 'updated_at'))
+            rewritten += len(renames)
+            self.stdout.write(f"Canonicalized {rewritten} links, merged {merged} jobs (up to id {last_id})")
+        return rewritten, merged
+
+    def handle(self, *args, **options):
+        rewritten, merged = self.canonicalize_links(options['batch_size'])
+
+        jobs = Job.objects.all() if options['all'] else Job.objects.filter(minhash__isnull=True)
+        last_id = 0
+        updated = 0
+        duplicates = 0
+        while True:
+            # Ascending ids: every older job is signed before its duplicates are linked
+            rows = list(
+                jobs.filter(id__gt=last_id)
+                .order_by('id')
+                .values_list('id', 'title', 'company', 'description_text', 'apply_link')[:options['batch_size']]
+            )
+            if not rows:
+                break
+
+            now = timezone.now()
+            batch = []
+            for job_id, title, company, description_text, _ in rows:
+                signature = minhash_signature(title, company, description_text)
+                batch.append(Job(id=job_id, minhash=signature, lsh_buckets=lsh_buckets(signature), updated_at=now))
+            Job.objects.bulk_update(batch, ('minhash', 'lsh_buckets', 'updated_at'))
+            duplicates += link_near_duplicates(connection, [row[4] for row in rows])
+
+            updated += len(batch)
+            last_id = rows[-1][0]
+            self.stdout.write(f"Signed {updated} jobs (up to id {last_id}), {duplicates} duplicates linked")
+
+        if updated or rewritten or merged:
+            DataVersion.bump()
+        self.stdout.write(self.style.SUCCESS(
+            f"Done, {rewritten} links canonicalized, {merged} jobs merged, "
+            f"{updated} jobs signed and {duplicates} duplicates linked."
+        ))
@@ -0,0 +1,66 @@
+import timeit
+
+from django.core.management.base import BaseCommand
+from django.http import JsonResponse
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.serializers import DETAIL_FIELDS, LIST_FIELDS, OrjsonResponse, rows_to_dicts
+
+DESCRIPTION = '<div class="prose"><p>' + 'Build and ship data pipelines. ' * 80 + '</p></div>'
+
+
+def _legacy_page(jobs):
+    # The hand-built dicts and stdlib encoder get_jobs used before orjson
+    return JsonResponse({'jobs': [{
+        'id': job.id,
+        'title': job.title,
+        'company': job.company,
+        'location': job.location,
+        'description': job.description,
+        'apply_link': job.apply_link,
+        'tags': job.tags,
+        'pay': job.pay,
+        'experience': job.experience,
+        'created_at': job.created_at
+    } for job in jobs]})
+
+
+class Command(BaseCommand):
+    help = "Compares JSON encode time and size of jobs pages: legacy JsonResponse vs orjson rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000])
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        self.stdout.write(f"{'jobs':>6} {'variant':<18} {'ms/page':>9} {'bytes':>10}")
+
+        for size in options['sizes']:
+            jobs = [Job(
+                id=i,
+                title=f'Senior Data Engineer {i}',
+                company='Acme Analytics',
+                location='Bengaluru, India',
+                description=DESCRIPTION,
+                apply_link=f'https://example.com/jobs/{i}',
+                tags=['Python', 'Django', 'PostgreSQL', 'AWS'],
+                pay='₹20L - ₹35L',
+                experience='3 - 6 years',
+                created_at=now,
+                snippet=DESCRIPTION[:200],
+            ) for i in range(size)]
+            # values_list() tuples, as the views read them
+            detail_rows = [tuple(getattr(job, field) for field in DETAIL_FIELDS) for job in jobs]
+            list_rows = [tuple(getattr(job, field) for field in LIST_FIELDS) for job in jobs]
+
+            variants = {
+                'legacy': lambda: _legacy_page(jobs),
+                'orjson detail': lambda: OrjsonResponse({'jobs': rows_to_dicts(DETAIL_FIELDS, detail_rows)}),
+                'orjson list': lambda: OrjsonResponse({'jobs': rows_to_dicts(LIST_FIELDS, list_rows)}),
+            }
+            for name, build in variants.items():
+                number = max(1, 1000 // size)
+                best = min(timeit.repeat(build, number=number, repeat=options['repeat'])) / number
+                self.stdout.write(f"{size:>6} {name:<18} {best * 1000:>9.3f} {len(build().content):>10}")
@@ -0,0 +1,55 @@
+import random
+import tempfile
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from jobs.similarity import SimilarityIndex, get_index
+
+TAGS = ['Python', 'Django', 'React', 'AWS', 'PostgreSQL', 'Kubernetes', 'Go', 'TypeScript', 'Java', 'Spark']
+
+
+class Command(BaseCommand):
+    help = "Measures similar-jobs index build time and top-k query latency on a synthetic corpus."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=500000)
+        parser.add_argument('--queries', type=int, default=1000)
+        parser.add_argument('--k', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        vocabulary = [f"term{i}" for i in range(20000)]
+        jobs = ({
+            'id': i,
+            'title': ' '.join(rng.choices(vocabulary[:500], k=4)),
+            'tags': rng.sample(TAGS, 3),
+            'company': f"company{rng.randrange(2000)}",
+            'description_text': ' '.join(rng.choices(vocabulary, k=120)),
+        } for i in range(options['jobs']))
+
+        started = time.perf_counter()
+        index = SimilarityIndex.build(jobs)
+        build_seconds = time.perf_counter() - started
+
+        with tempfile.TemporaryDirectory() as directory:
+            index.save(directory)
+            index = get_index(directory)
+
+            latencies = []
+            for _ in range(options['queries']):
+                job_id = rng.randrange(options['jobs'])
+                started = time.perf_counter()
+                index.similar(job_id, options['k'])
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        latencies = np.array(latencies)
+        self.stdout.write(f"jobs:          {options['jobs']}")
+        self.stdout.write(f"nnz:           {index.rows.nnz}")
+        self.stdout.write(f"build:         {build_seconds:.1f} s")
+        self.stdout.write(
+            f"query (k={options['k']}): p50 {np.percentile(latencies, 50):.2f} ms, "
+            f"p99 {np.percentile(latencies, 99):.2f} ms"
+        )
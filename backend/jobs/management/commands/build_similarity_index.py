@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from jobs.models import DataVersion, Job
+from jobs.similarity import SOURCE_FIELDS, SimilarityIndex
+
+CHUNK_SIZE = 2000
+
+
+class Command(BaseCommand):
+    help = (
+        "Builds or incrementally refreshes the similar-jobs index. "
+        "Run it after every scraper run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help="Rebuild from scratch, recomputing IDF weights.")
+
+    def handle(self, *args, **options):
+        directory = settings.SIMILARITY_INDEX_DIR
+        # Taken before reading rows, so writes that land mid-build are picked up next time
+        built_at = timezone.now()
+        version = DataVersion.current().version
+        index = None if options['full'] else SimilarityIndex.load(directory, mmap_mode=None)
+
+        if index is None:
+            jobs = Job.objects.order_by('id').values(*SOURCE_FIELDS).iterator(chunk_size=CHUNK_SIZE)
+            index = SimilarityIndex.build(jobs, built_at.isoformat(), version)
+            self.stdout.write(f"Built index of {len(index.ids)} jobs.")
+        else:
+            changed = Job.objects.filter(updated_at__gt=parse_datetime(index.built_at))
+            live_ids = list(Job.objects.values_list('id', flat=True))
+            changed_count = changed.count()
+            index = index.update(
+                changed.order_by('id').values(*SOURCE_FIELDS).iterator(chunk_size=CHUNK_SIZE),
+                live_ids,
+                built_at.isoformat(),
+                version,
+            )
+            self.stdout.write(f"Re-vectorized {changed_count} changed jobs, index now holds {len(index.ids)}.")
+
+        index.save(directory)
+        self.stdout.write(self.style.SUCCESS(f"Saved similarity index to {directory}"))
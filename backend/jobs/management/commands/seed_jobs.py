@@ -0,0 +1,43 @@
+import random
+
+from django.core.management.base import BaseCommand
+
+from jobs.models import DataVersion, Job
+
+TITLES = ['Backend Engineer', 'Data Scientist', 'Product Designer', 'DevOps Engineer', 'ML Engineer', 'Frontend Developer']
+COMPANIES = ['Acme Analytics', 'Globex', 'Initech', 'Hooli', 'Pied Piper', 'Umbrella Labs']
+LOCATIONS = ['Bengaluru', 'Mumbai', 'Remote', 'Pune', 'Hyderabad', 'Delhi NCR']
+TAGS = ['Python', 'Django', 'React', 'AWS', 'PostgreSQL', 'Kubernetes', 'Go', 'TypeScript']
+
+
+class Command(BaseCommand):
+    help = "Inserts synthetic jobs for local load testing and benchmarks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=10000)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        start = Job.objects.count()
+        batch = []
+        for i in range(start, start + options['count']):
+            batch.append(Job(
+                title=rng.choice(TITLES),
+                company=rng.choice(COMPANIES),
+                location=rng.choice(LOCATIONS),
+                description=f"<p>{' '.join(rng.choices(TAGS, k=60))}</p>",
+                apply_link=f"https://example.com/seed/{i}",
+                tags=rng.sample(TAGS, 3),
+                pay=f"₹{rng.randint(5, 30)}L - ₹{rng.randint(31, 60)}L",
+                experience=f"{rng.randint(0, 5)} - {rng.randint(6, 10)} years",
+            ))
+            if len(batch) >= options['batch_size']:
+                Job.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            Job.objects.bulk_create(batch)
+        # bulk_create() sends no post_save signals
+        DataVersion.bump()
+        self.stdout.write(self.style.SUCCESS(f"Inserted {options['count']} jobs."))
@@ -0,0 +1,58 @@
+# Generated by Django 5.0.4 on 2026-10-18 09:12
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+SEARCH_VECTOR_SQL = """
+CREATE OR REPLACE FUNCTION jobs_job_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.company, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce((
+            SELECT string_agg(tag, ' ')
+            FROM jsonb_array_elements_text(
+                CASE WHEN jsonb_typeof(NEW.tags) = 'array' THEN NEW.tags ELSE '[]'::jsonb END
+            ) AS tag
+        ), '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(NEW.location, '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(NEW.description, '')), 'D');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS jobs_job_search_vector_trigger ON jobs_job;
+CREATE TRIGGER jobs_job_search_vector_trigger
+    BEFORE INSERT OR UPDATE ON jobs_job
+    FOR EACH ROW EXECUTE FUNCTION jobs_job_search_vector_update();
+
+-- Fire the trigger once for every existing row.
+UPDATE jobs_job SET title = title;
+"""
+
+DROP_SEARCH_VECTOR_SQL = """
+DROP TRIGGER IF EXISTS jobs_job_search_vector_trigger ON jobs_job;
+DROP FUNCTION IF EXISTS jobs_job_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0003_alter_job_apply_link'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='jobs_job_search_gin'),
+        ),
+        migrations.RunSQL(SEARCH_VECTOR_SQL, DROP_SEARCH_VECTOR_SQL),
+    ]
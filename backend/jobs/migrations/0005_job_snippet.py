@@ -0,0 +1,45 @@
+# Generated by Django 5.0.4 on 2026-10-18 10:03
+
+from django.db import migrations, models
+
+
+SNIPPET_SQL = r"""
+CREATE OR REPLACE FUNCTION jobs_job_snippet_update() RETURNS trigger AS $$
+BEGIN
+    NEW.snippet := left(btrim(regexp_replace(
+        regexp_replace(coalesce(NEW.description, ''), '<[^>]*>', ' ', 'g'),
+        '\s+', ' ', 'g'
+    )), 200);
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS jobs_job_snippet_trigger ON jobs_job;
+CREATE TRIGGER jobs_job_snippet_trigger
+    BEFORE INSERT OR UPDATE ON jobs_job
+    FOR EACH ROW EXECUTE FUNCTION jobs_job_snippet_update();
+
+-- Fire the trigger once for every existing row.
+UPDATE jobs_job SET description = description;
+"""
+
+DROP_SNIPPET_SQL = """
+DROP TRIGGER IF EXISTS jobs_job_snippet_trigger ON jobs_job;
+DROP FUNCTION IF EXISTS jobs_job_snippet_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_job_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='snippet',
+            field=models.CharField(blank=True, default='', editable=False, max_length=200),
+        ),
+        migrations.RunSQL(SNIPPET_SQL, DROP_SNIPPET_SQL),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.4 on 2026-10-18 11:20
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def create_data_version(apps, schema_editor):
+    DataVersion = apps.get_model('jobs', 'DataVersion')
+    DataVersion.objects.get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0005_job_snippet'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.CreateModel(
+            name='DataVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(create_data_version, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.0.4 on 2026-10-18 12:41
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0006_job_updated_at_dataversion'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['location'], name='jobs_job_location_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['company'], name='jobs_job_company_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['experience'], name='jobs_job_experience_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['tags'], name='jobs_job_tags_gin'),
+        ),
+    ]
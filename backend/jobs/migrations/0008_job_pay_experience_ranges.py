@@ -0,0 +1,59 @@
+# Generated by Django 5.0.4 on 2026-10-18 14:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0007_job_facet_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='pay_min',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='pay_max',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='pay_currency',
+            field=models.CharField(blank=True, max_length=3, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='pay_period',
+            field=models.CharField(blank=True, max_length=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='experience_min',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='experience_max',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['pay_currency', 'pay_min'], name='jobs_job_pay_min_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['pay_currency', 'pay_max'], name='jobs_job_pay_max_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['experience_min'], name='jobs_job_exp_min_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['experience_max'], name='jobs_job_exp_max_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.0.4 on 2026-10-18 15:10
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0008_job_pay_experience_ranges'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='canonical_job',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='jobs.job'),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='minhash',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), blank=True, editable=False, null=True, size=None),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='lsh_buckets',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=16), blank=True, editable=False, null=True, size=None),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['lsh_buckets'], name='jobs_job_lsh_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('canonical_job__isnull', True)), fields=['id'], name='jobs_job_canonical_idx'),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.0.4 on 2026-10-18 15:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0009_job_near_duplicates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='first_seen_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='last_seen_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        # created_at is rewritten on every scrape, so it is the closest thing
+        # to a sighting time that existing rows have
+        migrations.RunSQL(
+            sql="UPDATE jobs_job SET first_seen_at = created_at, last_seen_at = created_at;",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.RemoveIndex(
+            model_name='job',
+            name='jobs_job_canonical_idx',
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('canonical_job__isnull', True)), fields=['-first_seen_at', '-id'], name='jobs_job_first_seen_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['last_seen_at'], name='jobs_job_last_seen_idx'),
+        ),
+        migrations.CreateModel(
+            name='ArchivedJob',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=255)),
+                ('company', models.CharField(max_length=255)),
+                ('location', models.CharField(max_length=255)),
+                ('description', models.TextField(blank=True)),
+                ('apply_link', models.URLField()),
+                ('tags', models.JSONField(blank=True, default=list)),
+                ('pay', models.CharField(blank=True, max_length=100, null=True)),
+                ('experience', models.CharField(blank=True, max_length=100, null=True)),
+                ('pay_min', models.BigIntegerField(blank=True, null=True)),
+                ('pay_max', models.BigIntegerField(blank=True, null=True)),
+                ('pay_currency', models.CharField(blank=True, max_length=3, null=True)),
+                ('pay_period', models.CharField(blank=True, max_length=10, null=True)),
+                ('experience_min', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('experience_max', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('first_seen_at', models.DateTimeField()),
+                ('last_seen_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['apply_link'], name='jobs_archivedjob_link_idx')],
+            },
+        ),
+    ]
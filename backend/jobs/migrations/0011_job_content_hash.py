@@ -0,0 +1,47 @@
+# Generated by Django 5.0.4 on 2026-10-18 16:25
+
+from django.db import migrations, models
+
+
+# The derived-column triggers only need to run when their source columns are
+# written. Without a column list they also fired for the scrapers'
+# last_seen_at-only updates of unchanged jobs.
+NARROW_TRIGGERS_SQL = """
+DROP TRIGGER IF EXISTS jobs_job_search_vector_trigger ON jobs_job;
+CREATE TRIGGER jobs_job_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, company, tags, location, description ON jobs_job
+    FOR EACH ROW EXECUTE FUNCTION jobs_job_search_vector_update();
+
+DROP TRIGGER IF EXISTS jobs_job_snippet_trigger ON jobs_job;
+CREATE TRIGGER jobs_job_snippet_trigger
+    BEFORE INSERT OR UPDATE OF description ON jobs_job
+    FOR EACH ROW EXECUTE FUNCTION jobs_job_snippet_update();
+"""
+
+WIDE_TRIGGERS_SQL = """
+DROP TRIGGER IF EXISTS jobs_job_search_vector_trigger ON jobs_job;
+CREATE TRIGGER jobs_job_search_vector_trigger
+    BEFORE INSERT OR UPDATE ON jobs_job
+    FOR EACH ROW EXECUTE FUNCTION jobs_job_search_vector_update();
+
+DROP TRIGGER IF EXISTS jobs_job_snippet_trigger ON jobs_job;
+CREATE TRIGGER jobs_job_snippet_trigger
+    BEFORE INSERT OR UPDATE ON jobs_job
+    FOR EACH ROW EXECUTE FUNCTION jobs_job_snippet_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0010_job_first_last_seen_archivedjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=32, null=True),
+        ),
+        migrations.RunSQL(NARROW_TRIGGERS_SQL, WIDE_TRIGGERS_SQL),
+    ]
@@ -0,0 +1,135 @@
+# Generated by Django 5.0.4 on 2026-10-18 18:40
+
+from django.db import migrations, models
+
+
+# The scrapers now write description_text and snippet themselves. The trigger
+# only fills them for writers that do not (bulk-created seed data, raw SQL):
+# on insert when they are empty, on update when description changed but they
+# did not. Its name sorts before jobs_job_search_vector_trigger, so
+# description_text is set by the time the search vector is built from it.
+DESCRIPTION_SQL = r"""
+DROP TRIGGER IF EXISTS jobs_job_snippet_trigger ON jobs_job;
+DROP FUNCTION IF EXISTS jobs_job_snippet_update();
+
+CREATE OR REPLACE FUNCTION jobs_job_description_update() RETURNS trigger AS $$
+DECLARE
+    plain text := btrim(regexp_replace(
+        regexp_replace(coalesce(NEW.description, ''), '<[^>]*>', ' ', 'g'),
+        '\s+', ' ', 'g'
+    ));
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        IF coalesce(NEW.description_text, '') = '' THEN
+            NEW.description_text := plain;
+        END IF;
+        IF coalesce(NEW.snippet, '') = '' THEN
+            NEW.snippet := left(plain, 200);
+        END IF;
+    ELSIF NEW.description IS DISTINCT FROM OLD.description THEN
+        IF NEW.description_text IS NOT DISTINCT FROM OLD.description_text THEN
+            NEW.description_text := plain;
+        END IF;
+        IF NEW.snippet IS NOT DISTINCT FROM OLD.snippet THEN
+            NEW.snippet := left(plain, 200);
+        END IF;
+    END IF;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS jobs_job_description_trigger ON jobs_job;
+CREATE TRIGGER jobs_job_description_trigger
+    BEFORE INSERT OR UPDATE OF description ON jobs_job
+    FOR EACH ROW EXECUTE FUNCTION jobs_job_description_update();
+
+CREATE OR REPLACE FUNCTION jobs_job_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.company, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce((
+            SELECT string_agg(tag, ' ')
+            FROM jsonb_array_elements_text(
+                CASE WHEN jsonb_typeof(NEW.tags) = 'array' THEN NEW.tags ELSE '[]'::jsonb END
+            ) AS tag
+        ), '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(NEW.location, '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(NEW.description_text, '')), 'D');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS jobs_job_search_vector_trigger ON jobs_job;
+CREATE TRIGGER jobs_job_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, company, tags, location, description, description_text ON jobs_job
+    FOR EACH ROW EXECUTE FUNCTION jobs_job_search_vector_update();
+
+-- Tag-stripped text for existing rows (which also rebuilds their search
+-- vectors); backfill_job_descriptions replaces it with the sanitized versions.
+UPDATE jobs_job SET description_text = btrim(regexp_replace(
+    regexp_replace(description, '<[^>]*>', ' ', 'g'),
+    '\s+', ' ', 'g'
+));
+"""
+
+REVERSE_DESCRIPTION_SQL = r"""
+DROP TRIGGER IF EXISTS jobs_job_description_trigger ON jobs_job;
+DROP FUNCTION IF EXISTS jobs_job_description_update();
+
+CREATE OR REPLACE FUNCTION jobs_job_snippet_update() RETURNS trigger AS $$
+BEGIN
+    NEW.snippet := left(btrim(regexp_replace(
+        regexp_replace(coalesce(NEW.description, ''), '<[^>]*>', ' ', 'g'),
+        '\s+', ' ', 'g'
+    )), 200);
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS jobs_job_snippet_trigger ON jobs_job;
+CREATE TRIGGER jobs_job_snippet_trigger
+    BEFORE INSERT OR UPDATE OF description ON jobs_job
+    FOR EACH ROW EXECUTE FUNCTION jobs_job_snippet_update();
+
+CREATE OR REPLACE FUNCTION jobs_job_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.company, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce((
+            SELECT string_agg(tag, ' ')
+            FROM jsonb_array_elements_text(
+                CASE WHEN jsonb_typeof(NEW.tags) = 'array' THEN NEW.tags ELSE '[]'::jsonb END
+            ) AS tag
+        ), '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(NEW.location, '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(NEW.description, '')), 'D');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS jobs_job_search_vector_trigger ON jobs_job;
+CREATE TRIGGER jobs_job_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, company, tags, location, description ON jobs_job
+    FOR EACH ROW EXECUTE FUNCTION jobs_job_search_vector_update();
+
+-- Rebuild the search vectors from description again.
+UPDATE jobs_job SET description = description;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0011_job_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='description_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunSQL(DESCRIPTION_SQL, REVERSE_DESCRIPTION_SQL),
+    ]
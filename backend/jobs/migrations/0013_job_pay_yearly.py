@@ -0,0 +1,49 @@
+# Generated by Django 5.0.4 on 2026-10-18 21:05
+
+from django.db import migrations, models
+
+
+# Same conversion as scraper/normalize.py PERIODS_PER_YEAR
+FILL_YEARLY_SQL = """
+UPDATE jobs_job SET
+    pay_yearly_min = pay_min * CASE pay_period WHEN 'month' THEN 12 WHEN 'hour' THEN 2080 ELSE 1 END,
+    pay_yearly_max = pay_max * CASE pay_period WHEN 'month' THEN 12 WHEN 'hour' THEN 2080 ELSE 1 END
+WHERE pay_min IS NOT NULL OR pay_max IS NOT NULL;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0012_job_description_text'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='pay_yearly_min',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='pay_yearly_max',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RemoveIndex(
+            model_name='job',
+            name='jobs_job_pay_min_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='job',
+            name='jobs_job_pay_max_idx',
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['pay_currency', 'pay_yearly_min'], name='jobs_job_pay_yearly_min_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['pay_currency', 'pay_yearly_max'], name='jobs_job_pay_yearly_max_idx'),
+        ),
+        migrations.RunSQL(FILL_YEARLY_SQL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.0.4 on 2026-10-18 21:30
+
+from django.db import migrations
+
+
+# The fallback only fills description_text and snippet when the writer left
+# them empty, on update as on insert. Comparing them with the old row instead
+# replaced the scrapers' sanitized text with the tag-stripped one whenever a
+# description's markup changed but its text did not. The fallback text is
+# only built when it is used. ORM saves that change description (the admin
+# included) recompute both columns in Job.save() instead.
+FILL_EMPTY_SQL = r"""
+CREATE OR REPLACE FUNCTION jobs_job_description_update() RETURNS trigger AS $$
+DECLARE
+    plain text;
+BEGIN
+    IF coalesce(NEW.description_text, '') = '' OR coalesce(NEW.snippet, '') = '' THEN
+        plain := btrim(regexp_replace(
+            regexp_replace(coalesce(NEW.description, ''), '<[^>]*>', ' ', 'g'),
+            '\s+', ' ', 'g'
+        ));
+        IF coalesce(NEW.description_text, '') = '' THEN
+            NEW.description_text := plain;
+        END IF;
+        IF coalesce(NEW.snippet, '') = '' THEN
+            NEW.snippet := left(plain, 200);
+        END IF;
+    END IF;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+REVERSE_FILL_EMPTY_SQL = r"""
+CREATE OR REPLACE FUNCTION jobs_job_description_update() RETURNS trigger AS $$
+DECLARE
+    plain text := btrim(regexp_replace(
+        regexp_replace(coalesce(NEW.description, ''), '<[^>]*>', ' ', 'g'),
+        '\s+', ' ', 'g'
+    ));
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        IF coalesce(NEW.description_text, '') = '' THEN
+            NEW.description_text := plain;
+        END IF;
+        IF coalesce(NEW.snippet, '') = '' THEN
+            NEW.snippet := left(plain, 200);
+        END IF;
+    ELSIF NEW.description IS DISTINCT FROM OLD.description THEN
+        IF NEW.description_text IS NOT DISTINCT FROM OLD.description_text THEN
+            NEW.description_text := plain;
+        END IF;
+        IF NEW.snippet IS NOT DISTINCT FROM OLD.snippet THEN
+            NEW.snippet := left(plain, 200);
+        END IF;
+    END IF;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0013_job_pay_yearly'),
+    ]
+
+    operations = [
+        migrations.RunSQL(FILL_EMPTY_SQL, REVERSE_FILL_EMPTY_SQL),
+    ]
@@ -1,4 +1,15 @@
+import sys
+
+from django.conf import settings
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.utils import timezone
+
+# The description cleaner lives with the scrapers, which apply it at ingest
+sys.path.insert(0, str(settings.BASE_DIR.parent / 'scraper'))
+from normalize import clean_description, make_snippet  # noqa: E402
 
 # Create your models here.
 class Job(models.Model):
@@ -12,5 +23,163 @@ class Job(models.Model):
     experience = models.CharField(max_length=100, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Structured ranges parsed from pay/experience at ingest (scraper/normalize.py).
+    # Pay is in whole currency units per pay_period; the yearly columns hold
+    # the same range per year, which the pay filters compare against.
+    pay_min = models.BigIntegerField(blank=True, null=True)
+    pay_max = models.BigIntegerField(blank=True, null=True)
+    pay_currency = models.CharField(max_length=3, blank=True, null=True)
+    pay_period = models.CharField(max_length=10, blank=True, null=True)
+    pay_yearly_min = models.BigIntegerField(blank=True, null=True, editable=False)
+    pay_yearly_max = models.BigIntegerField(blank=True, null=True, editable=False)
+    experience_min = models.PositiveSmallIntegerField(blank=True, null=True)
+    experience_max = models.PositiveSmallIntegerField(blank=True, null=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Set by the scrapers' upsert: first_seen_at only on insert, last_seen_at
+    # on every scrape that still lists the job. Jobs unseen for a while are
+    # moved to ArchivedJob by the archive_stale_jobs command.
+    first_seen_at = models.DateTimeField(default=timezone.now)
+    last_seen_at = models.DateTimeField(default=timezone.now)
+
+    # Hash of the scraped content (scraper/db.py content_hash()); the
+    # scrapers' upsert leaves the row untouched when it is unchanged.
+    content_hash = models.CharField(max_length=32, blank=True, null=True, editable=False)
+
+    # Near-duplicate detection (scraper/dedup.py). A job whose MinHash
+    # signature matches an older job's points at that job's canonical and is
+    # hidden from the list API. lsh_buckets is the LSH index: candidates are
+    # the jobs sharing at least one bucket, found through its GIN index.
+    canonical_job = models.ForeignKey(
+        'self', on_delete=models.SET_NULL, blank=True, null=True, related_name='duplicates'
+    )
+    minhash = ArrayField(models.BigIntegerField(), blank=True, null=True, editable=False)
+    lsh_buckets = ArrayField(models.CharField(max_length=16), blank=True, null=True, editable=False)
+
+    # The scrapers store description as sanitized HTML (scraper/normalize.py
+    # clean_description()), along with its plain text, used for search and
+    # similarity, and a short preview for list views. ORM saves (the admin
+    # included) recompute both when description changes, see save(). Raw SQL
+    # writers that leave them empty get a cruder tag-stripped fill from a
+    # database trigger (see migrations 0012 and 0014); backfill_job_descriptions
+    # redoes older rows.
+    description_text = models.TextField(blank=True, default='', editable=False)
+    snippet = models.CharField(max_length=200, blank=True, default='', editable=False)
+
+    # Weighted full-text document (title > company/tags > location > description text).
+    # Kept up to date by a database trigger (see migration 0004) so the
+    # scrapers' raw INSERT ... ON CONFLICT upserts refresh it too.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['search_vector'], name='jobs_job_search_gin'),
+            # Facet filters on /api/jobs/
+            models.Index(fields=['location'], name='jobs_job_location_idx'),
+            models.Index(fields=['company'], name='jobs_job_company_idx'),
+            models.Index(fields=['experience'], name='jobs_job_experience_idx'),
+            GinIndex(fields=['tags'], name='jobs_job_tags_gin'),
+            # Range filters on /api/jobs/
+            models.Index(fields=['pay_currency', 'pay_yearly_min'], name='jobs_job_pay_yearly_min_idx'),
+            models.Index(fields=['pay_currency', 'pay_yearly_max'], name='jobs_job_pay_yearly_max_idx'),
+            models.Index(fields=['experience_min'], name='jobs_job_exp_min_idx'),
+            models.Index(fields=['experience_max'], name='jobs_job_exp_max_idx'),
+            # Near-duplicate lookup at ingest, and the canonical-only list scan
+            GinIndex(fields=['lsh_buckets'], name='jobs_job_lsh_gin'),
+            # Default list order (newest first) over canonical jobs
+            models.Index(
+                fields=['-first_seen_at', '-id'], name='jobs_job_first_seen_idx',
+                condition=models.Q(canonical_job__isnull=True),
+            ),
+            # Stale-job scan of archive_stale_jobs
+            models.Index(fields=['last_seen_at'], name='jobs_job_last_seen_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.title} at {self.company}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'description' in field_names:
+            instance._loaded_description = values[field_names.index('description')]
+        return instance
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if (
+            (update_fields is None or 'description' in update_fields)
+            and 'description' not in self.get_deferred_fields()
+            and self.description != getattr(self, '_loaded_description', None)
+        ):
+            self.description, self.description_text = clean_description(self.description)
+            self.snippet = make_snippet(self.description_text)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'description_text', 'snippet'}
+        super().save(*args, **kwargs)
+        self._loaded_description = self.description
+
+
+class ArchivedJob(models.Model):
+    """
+    Jobs that stopped being listed by their source. Rows keep their original
+    jobs_job id; the live table only holds what the scrapers still see.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=255)
+    company = models.CharField(max_length=255)
+    location = models.CharField(max_length=255)
+    description = models.TextField(blank=True)
+    apply_link = models.URLField()
+    tags = models.JSONField(default=list, blank=True)
+    pay = models.CharField(max_length=100, blank=True, null=True)
+    experience = models.CharField(max_length=100, blank=True, null=True)
+    pay_min = models.BigIntegerField(blank=True, null=True)
+    pay_max = models.BigIntegerField(blank=True, null=True)
+    pay_currency = models.CharField(max_length=3, blank=True, null=True)
+    pay_period = models.CharField(max_length=10, blank=True, null=True)
+    experience_min = models.PositiveSmallIntegerField(blank=True, null=True)
+    experience_max = models.PositiveSmallIntegerField(blank=True, null=True)
+    created_at = models.DateTimeField()
+    first_seen_at = models.DateTimeField()
+    last_seen_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['apply_link'], name='jobs_archivedjob_link_idx'),
+        ]
+
     def __str__(self):
-        return f"{self.title} at {self.company}"
\ No newline at end of file
+        return f"{self.title} at {self.company} (archived)"
+
+
+class DataVersion(models.Model):
+    """
+    Single-row counter for the jobs dataset. The scrapers bump it after every
+    ingest commit (and ORM writes bump it through signals), so the list
+    endpoint can answer conditional requests without touching jobs_job.
+    """
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"jobs data v{self.version}"
+
+    @classmethod
+    def current(cls):
+        return cls.objects.get_or_create(pk=1)[0]
+
+    @classmethod
+    async def acurrent(cls):
+        return (await cls.objects.aget_or_create(pk=1))[0]
+
+    @classmethod
+    def bump(cls):
+        # .update() skips auto_now, so the timestamp is set explicitly
+        updated = cls.objects.filter(pk=1).update(
+            version=models.F('version') + 1, updated_at=timezone.now()
+        )
+        if not updated:
+            cls.objects.create(pk=1, version=1)
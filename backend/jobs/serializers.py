@@ -0,0 +1,47 @@
+import orjson
+from django.http import HttpResponse
+from .models import Job
+
+# Columns that only exist for the database's benefit and never leave the API.
+INTERNAL_FIELDS = (
+    'search_vector', 'description_text', 'snippet', 'pay_yearly_min', 'pay_yearly_max', 'updated_at', 'minhash', 'lsh_buckets', 'content_hash', 'last_seen_at',
+)
+
+# Columns of the full job representation (get_job_details, batch and export),
+# generated once from the model so new columns are picked up automatically.
+DETAIL_FIELDS = tuple(
+    field.attname for field in Job._meta.concrete_fields if field.attname not in INTERNAL_FIELDS
+)
+
+# Columns shipped per card in list responses; the full (sanitized)
+# description is only served by get_job_details.
+LIST_FIELDS = (
+    'id', 'title', 'company', 'location', 'tags', 'pay', 'experience', 'created_at', 'first_seen_at', 'snippet'
+)
+
+# Datetimes go out as RFC 3339 with a trailing Z, like DjangoJSONEncoder's.
+ORJSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+def row_to_dict(fields, row):
+    """Builds the job dict from a values_list() tuple selected with `fields`."""
+    return dict(zip(fields, row))
+
+
+def rows_to_dicts(fields, rows):
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def dumps(data):
+    return orjson.dumps(data, option=ORJSON_OPTIONS)
+
+
+class OrjsonResponse(HttpResponse):
+    """
+    JsonResponse counterpart encoded with orjson, which handles datetimes
+    natively and is several times faster than the stdlib encoder.
+    """
+
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=dumps(data), **kwargs)
@@ -0,0 +1,10 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import DataVersion, Job
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def bump_data_version(sender, **kwargs):
+    # Admin and ORM writes invalidate the list ETag like a scraper run does
+    DataVersion.bump()
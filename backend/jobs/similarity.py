@@ -0,0 +1,225 @@
+"""
+Precomputed "similar jobs" index.
+
+Every job is turned into a hashed bag-of-words vector over its title, tags,
+company and description text, weighted by IDF and L2-normalized, so cosine
+similarity is a plain dot product. The matrix is kept in two layouts:
+CSR to look up a job's own vector, and CSC so a query only touches the
+postings of its own features instead of the whole corpus. Both are saved
+as .npy files and memory-mapped by the API process.
+"""
+import json
+import os
+import re
+import threading
+import zlib
+
+import numpy as np
+from scipy import sparse
+
+N_FEATURES = 2 ** 20
+
+# Title words count three times, tags twice, company and description once.
+# The description is read as the plain text stored at ingest, so no markup
+# has to be stripped here.
+FIELD_WEIGHTS = (('title', 3.0), ('tags', 2.0), ('company', 1.0), ('description_text', 1.0))
+SOURCE_FIELDS = ('id',) + tuple(field for field, _ in FIELD_WEIGHTS)
+
+# Query with at most this many of the job's strongest features; the rest
+# barely move the ranking and would only add postings to scan.
+MAX_QUERY_FEATURES = 48
+
+TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#]*')
+
+ARRAYS = ('ids', 'idf', 'row_data', 'row_indices', 'row_indptr', 'col_data', 'col_indices', 'col_indptr')
+META_FILE = 'meta.json'
+
+
+def _features(job):
+    counts = {}
+    for field, weight in FIELD_WEIGHTS:
+        value = job[field]
+        if field == 'tags':
+            text = ' '.join(value or [])
+        else:
+            text = value or ''
+        for token in TOKEN_RE.findall(text.lower()):
+            # crc32 rather than hash(): it must be stable across processes
+            feature = zlib.crc32(token.encode()) % N_FEATURES
+            counts[feature] = counts.get(feature, 0.0) + weight
+    return counts
+
+
+def term_matrix(jobs):
+    """
+    Builds the raw (sublinear) term-frequency matrix of `jobs`, an iterable
+    of dicts with SOURCE_FIELDS. Returns (ids, csr_matrix).
+    """
+    ids, indices, data, indptr = [], [], [], [0]
+    for job in jobs:
+        counts = _features(job)
+        ids.append(job['id'])
+        indices.extend(counts.keys())
+        data.extend(counts.values())
+        indptr.append(len(indices))
+    matrix = sparse.csr_matrix(
+        (np.asarray(data, dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+        shape=(len(ids), N_FEATURES),
+    )
+    matrix.data = 1.0 + np.log(matrix.data)
+    return np.asarray(ids, dtype=np.int64), matrix
+
+
+def inverse_document_frequency(matrix):
+    document_frequency = np.bincount(matrix.indices, minlength=N_FEATURES)
+    return (np.log((1.0 + matrix.shape[0]) / (1.0 + document_frequency)) + 1.0).astype(np.float32)
+
+
+def weight_rows(matrix, idf):
+    """Applies `idf` to a term matrix in place and L2-normalizes its rows."""
+    matrix.data *= idf[matrix.indices]
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    matrix.data /= np.repeat(norms, np.diff(matrix.indptr)).astype(np.float32)
+    return matrix
+
+
+class SimilarityIndex:
+    def __init__(self, ids, idf, rows, built_at=None, data_version=None):
+        # Rows are kept sorted by job id so lookups are a binary search
+        order = np.argsort(ids, kind='stable')
+        if not np.all(order == np.arange(len(ids))):
+            ids, rows = ids[order], rows[order]
+        self.ids = ids
+        self.idf = idf
+        self.rows = rows.tocsr()
+        self.columns = self.rows.tocsc()
+        self.built_at = built_at
+        self.data_version = data_version
+
+    @classmethod
+    def build(cls, jobs, built_at=None, data_version=None):
+        ids, matrix = term_matrix(jobs)
+        idf = inverse_document_frequency(matrix)
+        return cls(ids, idf, weight_rows(matrix, idf), built_at, data_version)
+
+    def update(self, changed_jobs, live_ids, built_at=None, data_version=None):
+        """
+        Returns a new index where `changed_jobs` are re-vectorized with the
+        existing IDF weights, and rows whose id is not in `live_ids` are
+        dropped. The untouched rows are reused as they are.
+        """
+        changed_ids, changed = term_matrix(changed_jobs)
+        keep = np.isin(self.ids, live_ids) & ~np.isin(self.ids, changed_ids)
+        ids = np.concatenate([self.ids[keep], changed_ids])
+        rows = sparse.vstack([self.rows[keep], weight_rows(changed, self.idf)], format='csr')
+        return SimilarityIndex(ids, self.idf, rows, built_at, data_version)
+
+    def similar(self, job_id, k=10):
+        """Returns up to k (job_id, score) pairs most similar to job_id, best first."""
+        position = np.searchsorted(self.ids, job_id)
+        if position >= len(self.ids) or self.ids[position] != job_id:
+            return None
+
+        start, end = self.rows.indptr[position], self.rows.indptr[position + 1]
+        features = np.asarray(self.rows.indices[start:end])
+        weights = np.asarray(self.rows.data[start:end])
+        if len(features) > MAX_QUERY_FEATURES:
+            strongest = np.argpartition(weights, -MAX_QUERY_FEATURES)[-MAX_QUERY_FEATURES:]
+            features, weights = features[strongest], weights[strongest]
+
+        # Only the postings of the query's own features are read
+        scores = self.columns[:, features] @ weights
+        scores[position] = -1.0
+        k = min(k, len(scores) - 1)
+        if k <= 0:
+            return []
+        top = np.argpartition(scores, -k)[-k:]
+        top = top[np.argsort(-scores[top])]
+        return [(int(self.ids[i]), float(scores[i])) for i in top if scores[i] > 0]
+
+    def save(self, directory):
+        """
+        Writes the arrays under a fresh build id, then swaps meta.json in
+        atomically so readers never see a half-written index.
+        """
+        os.makedirs(directory, exist_ok=True)
+        build_id = f"{os.getpid()}-{int.from_bytes(os.urandom(4), 'big'):08x}"
+        arrays = {
+            'ids': self.ids,
+            'idf': self.idf,
+            'row_data': self.rows.data,
+            'row_indices': self.rows.indices,
+            'row_indptr': self.rows.indptr,
+            'col_data': self.columns.data,
+            'col_indices': self.columns.indices,
+            'col_indptr': self.columns.indptr,
+        }
+        for name, array in arrays.items():
+            np.save(os.path.join(directory, f"{name}-{build_id}.npy"), np.ascontiguousarray(array))
+
+        previous = _read_meta(directory)
+        meta_path = os.path.join(directory, META_FILE)
+        with open(meta_path + '.tmp', 'w') as f:
+            json.dump({
+                'build_id': build_id,
+                'jobs': int(len(self.ids)),
+                'built_at': self.built_at,
+                'data_version': self.data_version,
+            }, f)
+        os.replace(meta_path + '.tmp', meta_path)
+
+        if previous:
+            for name in ARRAYS:
+                try:
+                    os.remove(os.path.join(directory, f"{name}-{previous['build_id']}.npy"))
+                except FileNotFoundError:
+                    pass
+
+    @classmethod
+    def load(cls, directory, mmap_mode='r'):
+        meta = _read_meta(directory)
+        if meta is None:
+            return None
+        arrays = {
+            name: np.load(os.path.join(directory, f"{name}-{meta['build_id']}.npy"), mmap_mode=mmap_mode)
+            for name in ARRAYS
+        }
+        index = cls.__new__(cls)
+        index.ids = arrays['ids']
+        index.idf = arrays['idf']
+        shape = (len(index.ids), N_FEATURES)
+        index.rows = sparse.csr_matrix(
+            (arrays['row_data'], arrays['row_indices'], arrays['row_indptr']), shape=shape, copy=False
+        )
+        index.columns = sparse.csc_matrix(
+            (arrays['col_data'], arrays['col_indices'], arrays['col_indptr']), shape=shape, copy=False
+        )
+        index.built_at = meta.get('built_at')
+        index.data_version = meta.get('data_version')
+        return index
+
+
+def _read_meta(directory):
+    try:
+        with open(os.path.join(directory, META_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+_loaded = {'mtime': None, 'index': None}
+_lock = threading.Lock()
+
+
+def get_index(directory):
+    """Returns the memory-mapped index, reloading it when a new build is saved."""
+    try:
+        mtime = os.stat(os.path.join(directory, META_FILE)).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    with _lock:
+        if _loaded['mtime'] != mtime:
+            _loaded['index'] = SimilarityIndex.load(directory)
+            _loaded['mtime'] = mtime
+        return _loaded['index']
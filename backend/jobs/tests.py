@@ -1,3 +1,190 @@
-from django.test import TestCase
+import sys
+from datetime import datetime, timedelta, timezone as dt_timezone
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+
+from .models import Job
+from .views import _decode_cursor, _encode_cursor
+
+# The normalization stage lives with the scrapers, which apply it at ingest
+sys.path.insert(0, str(settings.BASE_DIR.parent / 'scraper'))
+from normalize import clean_description, make_snippet, parse_experience, parse_pay  # noqa: E402
+
+
+class ParsePayTests(SimpleTestCase):
+    def test_lakh_range(self):
+        self.assertEqual(parse_pay('₹10L - ₹15L'), {
+            'pay_min': 1000000, 'pay_max': 1500000, 'pay_currency': 'INR', 'pay_period': 'year',
+            'pay_yearly_min': 1000000, 'pay_yearly_max': 1500000,
+        })
+
+    def test_thousands_suffix(self):
+        pay = parse_pay('$120k-$150k')
+        self.assertEqual((pay['pay_min'], pay['pay_max'], pay['pay_currency']), (120000, 150000, 'USD'))
+
+    def test_monthly_and_hourly_are_annualized(self):
+        monthly = parse_pay('₹50,000/month')
+        self.assertEqual((monthly['pay_period'], monthly['pay_min'], monthly['pay_yearly_min']), ('month', 50000, 600000))
+        hourly = parse_pay('$40/hr')
+        self.assertEqual((hourly['pay_period'], hourly['pay_yearly_max']), ('hour', 83200))
+
+    def test_open_ended(self):
+        pay = parse_pay('₹20 LPA+')
+        self.assertEqual((pay['pay_min'], pay['pay_max']), (2000000, None))
+
+    def test_unparseable(self):
+        for text in ('Competitive', '', None):
+            with self.subTest(text=text):
+                self.assertTrue(all(value is None for value in parse_pay(text).values()))
+
+
+class ParseExperienceTests(SimpleTestCase):
+    def test_values(self):
+        cases = {
+            '2-5 years': (2, 5),
+            '3+ years': (3, None),
+            '1 yr': (1, 1),
+            'Fresher': (0, 0),
+            'N/A': (None, None),
+            None: (None, None),
+        }
+        for text, expected in cases.items():
+            with self.subTest(text=text):
+                experience = parse_experience(text)
+                self.assertEqual((experience['experience_min'], experience['experience_max']), expected)
+
+
+class CleanDescriptionTests(SimpleTestCase):
+    def test_sanitizes_markup(self):
+        html, text = clean_description(
+            '<div class="x"><p>Hello <b>world</b><script>alert(1)</script></p>'
+            '<a href="javascript:x">bad</a> <a href="https://e.com" onclick="y">ok</a>'
+            '<ul><li>one</li></ul></div>'
+        )
+        self.assertEqual(html, '<p>Hello <b>world</b></p>bad <a href="https://e.com">ok</a><ul><li>one</li></ul>')
+        self.assertEqual(text, 'Hello world\nbad ok\none')
+
+    def test_empty(self):
+        self.assertEqual(clean_description(''), ('', ''))
+        self.assertEqual(clean_description(None), ('', ''))
+
+    def test_snippet_is_truncated(self):
+        snippet = make_snippet('word ' * 100)
+        self.assertLessEqual(len(snippet), 200)
+        self.assertTrue(snippet.endswith('…'))
+
+
+class CursorTests(SimpleTestCase):
+    def test_round_trip(self):
+        first_seen_at = datetime(2026, 10, 1, 12, 30, 15, 123456, tzinfo=dt_timezone.utc)
+        cursor = _encode_cursor({'first_seen_at': first_seen_at, 'id': 42})
+        self.assertEqual(_decode_cursor(cursor), (first_seen_at, 42))
+
+    def test_invalid(self):
+        for cursor in ('', 'garbage', 'e30', 'eyJpZCI6IDF9'):
+            with self.subTest(cursor=cursor), self.assertRaisesMessage(ValueError, 'Invalid cursor'):
+                _decode_cursor(cursor)
+
+
+class JobDescriptionTests(TestCase):
+    def setUp(self):
+        self.job = Job.objects.create(
+            title='Engineer', company='Acme', location='Remote', apply_link='https://example.com/jobs/1',
+            description='<div class="x"><p>Build <b>pipelines</b></p></div>',
+        )
+
+    def test_create_cleans_description(self):
+        job = Job.objects.get(id=self.job.id)
+        self.assertEqual(job.description, '<p>Build <b>pipelines</b></p>')
+        self.assertEqual((job.description_text, job.snippet), ('Build pipelines', 'Build pipelines'))
+
+    def test_edit_recomputes_text_and_search_vector(self):
+        job = Job.objects.get(id=self.job.id)
+        job.description = '<p>Maintain <i>dashboards</i></p>'
+        job.save(update_fields=['description'])
+        job = Job.objects.get(id=self.job.id)
+        self.assertEqual((job.description_text, job.snippet), ('Maintain dashboards', 'Maintain dashboards'))
+        self.assertTrue(Job.objects.filter(id=job.id, search_vector=SearchQuery('dashboards')).exists())
+        self.assertFalse(Job.objects.filter(id=job.id, search_vector=SearchQuery('pipelines')).exists())
+
+    def test_other_edits_keep_stored_text(self):
+        Job.objects.filter(id=self.job.id).update(description_text='Curated text')
+        job = Job.objects.get(id=self.job.id)
+        job.title = 'Senior Engineer'
+        job.save()
+        self.assertEqual(Job.objects.get(id=self.job.id).description_text, 'Curated text')
+
+
+class JobsApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        start = datetime(2026, 10, 1, tzinfo=dt_timezone.utc)
+        cls.jobs = [
+            Job.objects.create(
+                title=f"Engineer {i}", company='Acme', location='Remote',
+                description=f"<p>Role {i}</p>", apply_link=f"https://example.com/jobs/{i}",
+                first_seen_at=start + timedelta(hours=i), last_seen_at=start + timedelta(hours=i),
+            )
+            for i in range(5)
+        ]
+
+    def setUp(self):
+        # Responses are cached under the data version, which restarts with every test
+        cache.clear()
+
+    def test_cursor_walk(self):
+        newest_first = [job.id for job in reversed(self.jobs)]
+        seen = []
+        response = self.client.get('/api/jobs/', {'limit': 2})
+        while True:
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            seen.extend(job['id'] for job in data['jobs'])
+            if not data['pagination']['has_next']:
+                break
+            response = self.client.get('/api/jobs/', {'limit': 2, 'after': data['pagination']['next']})
+        self.assertEqual(seen, newest_first)
+
+        previous = self.client.get('/api/jobs/', {'limit': 2, 'before': data['pagination']['prev']}).json()
+        self.assertEqual([job['id'] for job in previous['jobs']], newest_first[2:4])
+
+    def test_invalid_cursor(self):
+        for param in ('after', 'before'):
+            with self.subTest(param=param):
+                response = self.client.get('/api/jobs/', {param: 'garbage'})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {'error': 'Invalid cursor'})
+
+    def test_malformed_integers(self):
+        for params in ({'limit': 'x'}, {'page': '1.5'}, {'per_page': 'ten'}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get('/api/jobs/', params).status_code, 400)
+
+    def test_fields(self):
+        data = self.client.get('/api/jobs/', {'fields': 'title,company'}).json()
+        self.assertEqual(set(data['jobs'][0]), {'id', 'title', 'company'})
+
+        response = self.client.get('/api/jobs/', {'fields': 'title,salary'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'Unknown fields: salary'})
+
+    def test_list_not_modified(self):
+        response = self.client.get('/api/jobs/')
+        etag = response.headers['ETag']
+        self.assertEqual(self.client.get('/api/jobs/', headers={'If-None-Match': etag}).status_code, 304)
+
+        # Any ORM write moves the data version, so the old ETag no longer matches
+        self.jobs[0].title = 'Staff Engineer'
+        self.jobs[0].save()
+        response = self.client.get('/api/jobs/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_detail_not_modified(self):
+        url = f"/api/jobs/{self.jobs[0].id}/"
+        etag = self.client.get(url).headers['ETag']
+        self.assertEqual(self.client.get(url, headers={'If-None-Match': etag}).status_code, 304)
+        self.assertEqual(self.client.get('/api/jobs/999999/').status_code, 404)
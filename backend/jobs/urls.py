@@ -3,5 +3,9 @@ from . import views
 
 urlpatterns = [
     path('jobs/', views.get_jobs, name='get_jobs'),
+    path('jobs/batch/', views.get_jobs_batch, name='get_jobs_batch'),
+    path('jobs/export/', views.export_jobs, name='export_jobs'),
+    path('jobs/cache-stats/', views.get_cache_stats, name='get_cache_stats'),
     path('jobs/<int:job_id>/', views.get_job_details, name='get_job_details'),
+    path('jobs/<int:job_id>/similar/', views.get_similar_jobs, name='get_similar_jobs'),
 ]
\ No newline at end of file
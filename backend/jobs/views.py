@@ -1,36 +1,388 @@
+import base64
+import csv
+import hashlib
+import json
+import re
+from datetime import datetime, time
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.shortcuts import render
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
 from django.core.paginator import Paginator
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F, Q
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.text import compress_sequence
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_http_methods
+from .cache import (
+    RESPONSE_CACHE_TIMEOUT, adata_version, cache_stats, cached_json_response, data_version,
+    record_lookups, response_cache_key, revalidated,
+)
 from .models import Job
+from .similarity import get_index
+from .serializers import DETAIL_FIELDS, LIST_FIELDS, OrjsonResponse, dumps, row_to_dict, rows_to_dicts
 
 # Create your views here.
 
-def get_jobs(request):
+MAX_CURSOR_LIMIT = 100
+MAX_PER_PAGE = 100
+COUNT_CACHE_TIMEOUT = 60  # seconds
+
+# Exact-match filters on /api/jobs/; each takes a comma-separated list or repeats.
+FILTER_FIELDS = ('location', 'company', 'experience')
+FACET_LIMIT = 20  # values returned per facet dimension
+
+# Range filters: query parameter -> (lower, upper) columns of the parsed range.
+# Pay bounds are yearly amounts, compared in a single currency.
+RANGE_FILTERS = {
+    'pay': ('pay_yearly_min', 'pay_yearly_max'),
+    'exp': ('experience_min', 'experience_max'),
+}
+DEFAULT_PAY_CURRENCY = 'INR'
+
+MAX_BATCH_IDS = 500
+MAX_SIMILAR = 50
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_BLOCK_SIZE = 64 * 1024  # bytes per async export message
+GZIP_RE = re.compile(r'\bgzip\b')
+
+
+async def _jobs_etag(request, *args, **kwargs):
+    return f"jobs-v{(await adata_version(request)).version}"
+
+
+async def _jobs_last_modified(request, *args, **kwargs):
+    return (await adata_version(request)).updated_at
+
+
+async def _job_updated_at(request, job_id):
+    # Primary-key lookup of a single column, no row is built
+    if not hasattr(request, '_job_updated_at'):
+        request._job_updated_at = await Job.objects.filter(id=job_id).values_list('updated_at', flat=True).afirst()
+    return request._job_updated_at
+
+
+async def _job_etag(request, job_id):
+    updated_at = await _job_updated_at(request, job_id)
+    if updated_at is None:
+        return None
+    return f"job-{job_id}-{int(updated_at.timestamp() * 1_000_000)}"
+
+
+async def _job_last_modified(request, job_id):
+    return await _job_updated_at(request, job_id)
+
+
+def _list_fields(request):
+    """Returns the columns requested with ?fields=, or raises ValueError."""
+    fields = request.GET.get('fields')
+    if not fields:
+        return LIST_FIELDS
+    requested = [field.strip() for field in fields.split(',') if field.strip()]
+    unknown = [field for field in requested if field not in LIST_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    # The id is always included so cards stay linkable and cursors can be built
+    return ('id',) + tuple(field for field in requested if field != 'id')
+
+
+def _search_jobs(query):
+    # Near-duplicates (see scraper/dedup.py) are only listed through their canonical job
+    jobs = Job.objects.filter(canonical_job__isnull=True)
+    if query:
+        # Ranked full-text search, served by the GIN index on search_vector
+        search_query = SearchQuery(query, search_type='websearch', config='english')
+        return jobs.filter(search_vector=search_query).annotate(
+            rank=SearchRank(F('search_vector'), search_query)
+        ).order_by('-rank', 'id')
+    # Newest first, served by the partial index on (first_seen_at, id)
+    return jobs.order_by('-first_seen_at', '-id')
+
+
+def _int_param(request, param, default, minimum=1, maximum=None):
+    """
+    Reads an integer query parameter clamped to [minimum, maximum], or
+    raises ValueError when it is not an integer.
+    """
+    raw = request.GET.get(param)
+    if raw is None or raw == '':
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise ValueError(f"{param} must be an integer") from None
+    value = max(value, minimum)
+    return min(value, maximum) if maximum is not None else value
+
+
+def _filter_values(request, param):
+    values = []
+    for raw in request.GET.getlist(param):
+        values.extend(value.strip() for value in raw.split(',') if value.strip())
+    return values
+
+
+def _filter_jobs(request, jobs):
+    """
+    Applies the location/company/experience filters (B-tree indexed), the
+    tags filter (GIN indexed, ?tags_mode=any|all) and the pay/experience
+    range filters. Raises ValueError on malformed parameters.
+    """
+    for field in FILTER_FIELDS:
+        values = _filter_values(request, field)
+        if values:
+            jobs = jobs.filter(**{f"{field}__in": values})
+
+    tags = _filter_values(request, 'tags')
+    if tags:
+        tags_mode = request.GET.get('tags_mode', 'any')
+        if tags_mode == 'all':
+            jobs = jobs.filter(tags__contains=tags)
+        elif tags_mode == 'any':
+            jobs = jobs.filter(tags__has_any_keys=tags)
+        else:
+            raise ValueError('tags_mode must be any or all')
+
+    # Amounts in different currencies do not compare, so pay bounds always
+    # come with one: ?pay_currency= or else DEFAULT_PAY_CURRENCY
+    pay_currency = request.GET.get('pay_currency', '').strip().upper()
+    if not pay_currency and (request.GET.get('pay_min') or request.GET.get('pay_max')):
+        pay_currency = DEFAULT_PAY_CURRENCY
+    if pay_currency:
+        jobs = jobs.filter(pay_currency=pay_currency)
+
+    # ?pay_min=/?pay_max= and ?exp_min=/?exp_max= keep jobs whose parsed range
+    # overlaps the requested one; an open-ended range ("5+ years") has no max.
+    for param, (lower, upper) in RANGE_FILTERS.items():
+        minimum = _int_param(request, f"{param}_min", None, minimum=0)
+        if minimum is not None:
+            jobs = jobs.filter(
+                Q(**{f"{upper}__gte": minimum}) | Q(**{f"{upper}__isnull": True, f"{lower}__isnull": False})
+            )
+        maximum = _int_param(request, f"{param}_max", None, minimum=0)
+        if maximum is not None:
+            jobs = jobs.filter(**{f"{lower}__lte": maximum})
+    return jobs
+
+
+FACETS_SQL = """
+WITH filtered AS ({jobs_sql})
+SELECT dimension, value, total FROM (
+    SELECT dimension, value, total,
+           ROW_NUMBER() OVER (PARTITION BY dimension ORDER BY total DESC, value) AS position
+    FROM (
+        SELECT 'location' AS dimension, location AS value, COUNT(*) AS total
+        FROM filtered GROUP BY location
+        UNION ALL
+        SELECT 'company', company, COUNT(*) FROM filtered GROUP BY company
+        UNION ALL
+        SELECT 'experience', experience, COUNT(*)
+        FROM filtered WHERE experience IS NOT NULL GROUP BY experience
+        UNION ALL
+        SELECT 'tags', tag, COUNT(*)
+        FROM filtered CROSS JOIN LATERAL jsonb_array_elements_text(
+            CASE WHEN jsonb_typeof(filtered.tags) = 'array' THEN filtered.tags ELSE '[]'::jsonb END
+        ) AS tag
+        GROUP BY tag
+    ) AS counts
+) AS ranked
+WHERE position <= %s
+ORDER BY dimension, total DESC, value
+"""
+
+
+def _facet_counts(jobs):
+    """
+    Counts the top values of every facet dimension over the filtered jobs in
+    a single query: the filtered set is scanned once into a CTE and grouped
+    per dimension.
+    """
+    jobs_sql, params = jobs.order_by().values(*FILTER_FIELDS, 'tags').query.sql_with_params()
+    facets = {dimension: [] for dimension in FILTER_FIELDS + ('tags',)}
+    with connection.cursor() as cursor:
+        cursor.execute(FACETS_SQL.format(jobs_sql=jobs_sql), (*params, FACET_LIMIT))
+        for dimension, value, total in cursor.fetchall():
+            facets[dimension].append({'value': value, 'count': total})
+    return facets
+
+
+def _encode_cursor(row):
+    payload = json.dumps({'first_seen_at': row['first_seen_at'].isoformat(), 'id': row['id']}).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def _decode_cursor(cursor):
+    """
+    Returns the (first_seen_at, id) position encoded in an opaque cursor,
+    or raises ValueError.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        first_seen_at = parse_datetime(payload['first_seen_at'])
+        if first_seen_at is None:
+            raise ValueError
+        return first_seen_at, int(payload['id'])
+    except (TypeError, KeyError, ValueError) as e:
+        raise ValueError('Invalid cursor') from e
+
+
+# The OR alone is only a filter, so Postgres would walk the index from its end
+# and discard every row before the cursor. The redundant first_seen_at bound
+# becomes the index condition the scan starts from.
+
+def _older_than(cursor):
+    first_seen_at, job_id = _decode_cursor(cursor)
+    return Q(first_seen_at__lte=first_seen_at) & (
+        Q(first_seen_at__lt=first_seen_at) | Q(first_seen_at=first_seen_at, id__lt=job_id)
+    )
+
+
+def _newer_than(cursor):
+    first_seen_at, job_id = _decode_cursor(cursor)
+    return Q(first_seen_at__gte=first_seen_at) & (
+        Q(first_seen_at__gt=first_seen_at) | Q(first_seen_at=first_seen_at, id__gt=job_id)
+    )
+
+
+async def _cached_count(jobs, version):
+    # COUNT(*) scans the whole (filtered) table, so page mode reuses it for a
+    # minute; keying on the data version drops it as soon as an ingest lands
+    digest = hashlib.md5(str(jobs.order_by().query).encode()).hexdigest()
+    key = f"jobs:count:{version}:{digest}"
+    total_count = await cache.aget(key)
+    if total_count is None:
+        total_count = await jobs.acount()
+        await cache.aset(key, total_count, COUNT_CACHE_TIMEOUT)
+    return total_count
+
+
+async def _fetch_rows(jobs, fields):
+    return rows_to_dicts(fields, [row async for row in jobs.values_list(*fields)])
+
+
+def _estimated_count(jobs):
+    # The planner's row estimate comes from table statistics, not a scan
+    sql, params = jobs.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def _wants_facets(request):
+    return request.GET.get('facets', '').lower() in ('1', 'true')
+
+
+async def _get_jobs_by_cursor(request, jobs, query, fields):
+    """
+    Keyset pagination on (first_seen_at, id), newest first: every page is an
+    index seek, so page 10,000 costs the same as page 1. first_seen_at is
+    never rewritten by the scrapers, so positions stay stable.
+    """
+    if query:
+        return JsonResponse({'error': 'Cursor pagination is not supported with q'}, status=400)
+
+    try:
+        limit = _int_param(request, 'limit', 10, maximum=MAX_CURSOR_LIMIT)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    matching_jobs = jobs
+    after = request.GET.get('after')
+    before = request.GET.get('before')
+    # The cursor is built from first_seen_at even when fields= leaves it out
+    row_fields = fields if 'first_seen_at' in fields else fields + ('first_seen_at',)
+
+    try:
+        if before:
+            rows = await _fetch_rows(
+                jobs.filter(_newer_than(before)).order_by('first_seen_at', 'id')[:limit + 1], row_fields
+            )
+            has_more = len(rows) > limit
+            rows = rows[:limit][::-1]
+            has_next, has_previous = True, has_more
+        else:
+            if after:
+                jobs = jobs.filter(_older_than(after))
+            rows = await _fetch_rows(jobs[:limit + 1], row_fields)
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            has_next, has_previous = has_more, bool(after)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    next_cursor = _encode_cursor(rows[-1]) if rows and has_next else None
+    prev_cursor = _encode_cursor(rows[0]) if rows and has_previous else None
+    if row_fields is not fields:
+        for row in rows:
+            del row['first_seen_at']
+
+    pagination = {
+        'limit': limit,
+        'next': next_cursor,
+        'prev': prev_cursor,
+        'has_next': has_next and bool(rows),
+        'has_previous': has_previous and bool(rows),
+    }
+
+    # The total is optional: none (default), a planner estimate or an exact count
+    count_mode = request.GET.get('count', 'none')
+    if count_mode == 'exact':
+        pagination['total_jobs'] = await _cached_count(matching_jobs, (await adata_version(request)).version)
+    elif count_mode == 'estimate':
+        pagination['total_jobs'] = await sync_to_async(_estimated_count)(matching_jobs)
+
+    response = {
+        'jobs': rows,
+        'pagination': pagination,
+    }
+    if _wants_facets(request):
+        response['facets'] = await sync_to_async(_facet_counts)(matching_jobs)
+
+    return OrjsonResponse(response)
+
+
+@revalidated(_jobs_etag, _jobs_last_modified)
+@cached_json_response
+async def get_jobs(request):
     try:
-        page = int(request.GET.get('page', 1))
-        per_page = int(request.GET.get('per_page', 10))
-        
+        query = request.GET.get('q', '').strip()
+
+        try:
+            jobs = _filter_jobs(request, _search_jobs(query))
+            fields = _list_fields(request)
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+        if any(param in request.GET for param in ('after', 'before', 'limit')):
+            return await _get_jobs_by_cursor(request, jobs, query, fields)
+
+        try:
+            page = _int_param(request, 'page', 1)
+            per_page = _int_param(request, 'per_page', 10, maximum=MAX_PER_PAGE)
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
         # Calculate offset and limit
         offset = (page - 1) * per_page
-        
-        # Get only the jobs needed for current page
-        jobs = Job.objects.order_by('id')[offset:offset + per_page]
-        total_count = Job.objects.count()  # Single count query
-        
-        # Prepare response data
-        jobs_data = [{
-            'id': job.id,
-            'title': job.title,
-            'company': job.company,
-            'location': job.location,
-            'description': job.description,
-            'apply_link': job.apply_link,
-            'tags': job.tags,
-            'pay': job.pay,
-            'experience': job.experience,
-            'created_at': job.created_at
-        } for job in jobs]
-        
+
+        # Get only the jobs needed for current page, as plain tuples of the
+        # listed columns (no model instances, no description HTML). The async
+        # ORM runs queries one at a time on the request's connection, so the
+        # count and the page are simply awaited in turn.
+        total_count = await _cached_count(jobs, (await adata_version(request)).version)
+        jobs_data = await _fetch_rows(jobs[offset:offset + per_page], fields)
+
         response = {
             'jobs': jobs_data,
             'pagination': {
@@ -41,34 +393,246 @@ def get_jobs(request):
                 'has_previous': page > 1
             }
         }
-        
-        return JsonResponse(response)
-        
+        if _wants_facets(request):
+            response['facets'] = await sync_to_async(_facet_counts)(jobs)
+
+        return OrjsonResponse(response)
+
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
-def get_job_details(request, job_id):
+@revalidated(_job_etag, _job_last_modified)
+@cached_json_response
+async def get_job_details(request, job_id):
     try:
         # Get single job by id
-        job = Job.objects.get(id=job_id)
-        
+        job = await Job.objects.values_list(*DETAIL_FIELDS).aget(id=job_id)
+
         # Prepare job data
-        job_data = {
-            'id': job.id,
-            'title': job.title,
-            'company': job.company,
-            'location': job.location,
-            'description': job.description,
-            'apply_link': job.apply_link,
-            'tags': job.tags,
-            'pay': job.pay,
-            'experience': job.experience,
-            'created_at': job.created_at
-        }
-        
-        return JsonResponse(job_data)
-        
+        job_data = row_to_dict(DETAIL_FIELDS, job)
+
+        return OrjsonResponse(job_data)
+
     except Job.DoesNotExist:
         return JsonResponse({'error': 'Job not found'}, status=404)
     except Exception as e:
-        return JsonResponse({'error': str(e)}, status=500)
\ No newline at end of file
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+def _batch_id(value):
+    """Returns a batch id given as a non-negative int or a string of digits, or raises ValueError."""
+    if isinstance(value, bool) or not (
+        (isinstance(value, int) and value >= 0) or (isinstance(value, str) and value.strip().isdigit())
+    ):
+        raise ValueError(f"Invalid job id: {json.dumps(value)}")
+    return int(value)
+
+
+def _batch_ids(request):
+    """Returns the unique ids of a batch request in order, or raises ValueError."""
+    if request.method == 'POST':
+        ids = json.loads(request.body).get('ids', [])
+        if not isinstance(ids, list):
+            raise ValueError('ids must be a list')
+    else:
+        ids = [value for value in request.GET.get('ids', '').split(',') if value.strip()]
+    ids = list(dict.fromkeys(_batch_id(job_id) for job_id in ids))
+    if not ids:
+        raise ValueError('No ids given')
+    if len(ids) > MAX_BATCH_IDS:
+        raise ValueError(f"At most {MAX_BATCH_IDS} ids per batch")
+    return ids
+
+
+@csrf_exempt
+@require_http_methods(["GET", "POST"])
+def get_jobs_batch(request):
+    """
+    Returns up to MAX_BATCH_IDS jobs keyed by id, plus the ids that do not
+    exist. Bodies are shared with get_job_details' cache entries, and the
+    misses are fetched with a single id__in query.
+    """
+    try:
+        ids = _batch_ids(request)
+    except (TypeError, ValueError, AttributeError) as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    try:
+        version = data_version(request).version
+        keys = {
+            job_id: response_cache_key(reverse('get_job_details', args=[job_id]), version)
+            for job_id in ids
+        }
+        cached = cache.get_many(keys.values())
+        found = {job_id: cached[key] for job_id, key in keys.items() if key in cached}
+
+        misses = [job_id for job_id in ids if job_id not in found]
+        record_lookups(hits=len(found), misses=len(misses))
+        if misses:
+            fresh = {}
+            for row in Job.objects.filter(id__in=misses).values_list(*DETAIL_FIELDS):
+                job_data = row_to_dict(DETAIL_FIELDS, row)
+                found[job_data['id']] = fresh[keys[job_data['id']]] = dumps(job_data)
+            cache.set_many(fresh, RESPONSE_CACHE_TIMEOUT)
+
+        # The cached bodies are already encoded, so splice them in as they are
+        jobs = b','.join(b'"%d":%s' % (job_id, found[job_id]) for job_id in ids if job_id in found)
+        missing = [job_id for job_id in ids if job_id not in found]
+        return HttpResponse(
+            b'{"jobs":{' + jobs + b'},"missing":' + dumps(missing) + b'}',
+            content_type='application/json',
+        )
+
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+@require_GET
+def get_similar_jobs(request, job_id):
+    """
+    Returns the jobs closest to job_id in the precomputed similarity index
+    (see jobs/similarity.py), best first, in the list representation.
+    """
+    try:
+        k = _int_param(request, 'k', 10, maximum=MAX_SIMILAR)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    try:
+        index = get_index(settings.SIMILARITY_INDEX_DIR)
+        neighbours = index.similar(job_id, k) if index is not None else None
+        if neighbours is None:
+            if not Job.objects.filter(id=job_id).exists():
+                return JsonResponse({'error': 'Job not found'}, status=404)
+            # Scraped after the last index build
+            return OrjsonResponse({'job_id': job_id, 'similar': [], 'indexed': False})
+
+        scores = dict(neighbours)
+        jobs = {
+            job['id']: job
+            for job in rows_to_dicts(
+                LIST_FIELDS,
+                Job.objects.filter(id__in=scores, canonical_job__isnull=True).values_list(*LIST_FIELDS),
+            )
+        }
+        similar = [
+            {**jobs[similar_id], 'score': round(score, 4)}
+            for similar_id, score in neighbours
+            if similar_id in jobs
+        ]
+        return OrjsonResponse({'job_id': job_id, 'similar': similar, 'indexed': True})
+
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+@require_GET
+def get_cache_stats(request):
+    stats = cache_stats()
+    stats['data_version'] = data_version(request).version
+    return JsonResponse(stats)
+
+
+class _Echo:
+    """File-like object whose write() hands the value back, for streaming csv.writer output."""
+
+    def write(self, value):
+        return value
+
+
+def _parse_since(value):
+    """Parses ?since= as an ISO datetime or date, or raises ValueError."""
+    since = parse_datetime(value)
+    if since is None:
+        since_date = parse_date(value)
+        if since_date is None:
+            raise ValueError('Invalid since, expected an ISO date or datetime')
+        since = datetime.combine(since_date, time.min)
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+def _export_ndjson(rows):
+    for row in rows:
+        yield dumps(row_to_dict(DETAIL_FIELDS, row)) + b'\n'
+
+
+def _csv_value(value):
+    # Nested and temporal values are written exactly as the JSON API encodes them
+    if isinstance(value, (list, dict)):
+        return dumps(value).decode()
+    if isinstance(value, datetime):
+        return dumps(value).decode().strip('"')
+    return value
+
+
+def _export_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(DETAIL_FIELDS).encode()
+    for row in rows:
+        yield writer.writerow([_csv_value(value) for value in row]).encode()
+
+
+async def _async_stream(chunks):
+    """
+    Drives the sync `chunks` pipeline through sync_to_async, in the thread
+    that owns the database connection, and yields about EXPORT_BLOCK_SIZE
+    bytes at a time so the event loop is never blocked on the cursor.
+    """
+    chunks = iter(chunks)
+
+    def next_block():
+        block = bytearray()
+        for chunk in chunks:
+            block += chunk
+            if len(block) >= EXPORT_BLOCK_SIZE:
+                break
+        return bytes(block)
+
+    while block := await sync_to_async(next_block)():
+        yield block
+
+
+@require_GET
+def export_jobs(request):
+    """
+    Streams every job as NDJSON (default) or CSV, in the get_job_details
+    row format. Rows come from a server-side cursor in fixed-size chunks,
+    so memory stays flat regardless of the table size.
+
+    Under WSGI the content is a plain generator. Under ASGI, Django would
+    drain a sync one into a list before sending it, so the same generator
+    is wrapped in an async iterator there.
+    """
+    export_format = request.GET.get('format', 'ndjson')
+    if export_format not in ('ndjson', 'csv'):
+        return JsonResponse({'error': 'format must be ndjson or csv'}, status=400)
+
+    jobs = Job.objects.order_by('id')
+    since = request.GET.get('since')
+    if since:
+        try:
+            jobs = jobs.filter(created_at__gte=_parse_since(since))
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+    rows = jobs.values_list(*DETAIL_FIELDS).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    if export_format == 'csv':
+        content, content_type = _export_csv(rows), 'text/csv'
+    else:
+        content, content_type = _export_ndjson(rows), 'application/x-ndjson'
+
+    # There is no GZipMiddleware, so compress the stream here when accepted
+    gzipped = bool(GZIP_RE.search(request.headers.get('Accept-Encoding', '')))
+    if gzipped:
+        content = compress_sequence(content)
+    if isinstance(request, ASGIRequest):
+        content = _async_stream(content)
+
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="jobs.{export_format}"'
+    if gzipped:
+        response['Content-Encoding'] = 'gzip'
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
@@ -1,3 +1,15 @@
 from django.test import TestCase
 
-# Create your tests here.
+from .models import User
+
+
+class ProfileTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.create(clerk_id='user_1', email='ada@example.com', full_name='Ada')
+
+    def test_get_profile(self):
+        response = self.client.get('/api/profile/user_1/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['email'], 'ada@example.com')
+        self.assertEqual(self.client.get('/api/profile/nobody/').status_code, 404)
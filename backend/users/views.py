@@ -9,7 +9,7 @@ from .models import User
 
 @csrf_exempt
 @require_GET
-def sync_user(request):
+async def sync_user(request):
     try:
         data = json.loads(request.body)
         clerk_id = data.get('clerk_id')
@@ -21,11 +21,11 @@ def sync_user(request):
             return JsonResponse({'error': 'Missing required fields'}, status=400)
         
         # Check if user already exists
-        user = User.objects.filter(clerk_id=clerk_id).first()
+        user = await User.objects.filter(clerk_id=clerk_id).afirst()
         
         if not user:
             # Only create new users, don't update existing ones
-            user = User.objects.create(
+            user = await User.objects.acreate(
                 clerk_id=clerk_id,
                 email=email,
                 full_name=full_name or '',
@@ -42,12 +42,12 @@ def sync_user(request):
 
 @csrf_exempt
 @require_POST
-def update_profile(request):
+async def update_profile(request):
     try:
         data = json.loads(request.body)
         clerk_id = data.get('clerk_id')
         
-        user = User.objects.filter(clerk_id=clerk_id).first()
+        user = await User.objects.filter(clerk_id=clerk_id).afirst()
         if not user:
             return JsonResponse({'error': 'User not found'}, status=404)
 
@@ -59,7 +59,7 @@ def update_profile(request):
         user.bio = data.get('bio')
         user.skills = data.get('skills')
         
-        user.save()
+        await user.asave()
         
         return JsonResponse({'status': 'success'})
         
@@ -68,9 +68,9 @@ def update_profile(request):
 
 @csrf_exempt
 @require_GET
-def get_user_profile(request, clerk_id):
+async def get_user_profile(request, clerk_id):
     try:
-        user = User.objects.filter(clerk_id=clerk_id).first()
+        user = await User.objects.filter(clerk_id=clerk_id).afirst()
         
         if not user:
             return JsonResponse({'error': 'User not found'}, status=404)
@@ -12,8 +12,7 @@ interface Job {
   title: string
   company: string
   location: string
-  description: string
-  apply_link: string
+  snippet: string
   tags: string[]
   pay: string
   experience: string
@@ -31,16 +30,29 @@ interface PaginationInfo {
 
 export default function Jobs() {
   const [searchTerm, setSearchTerm] = useState("")
+  const [query, setQuery] = useState("")
   const [jobs, setJobs] = useState<Job[]>([])
   const [loading, setLoading] = useState(true)
   const [pagination, setPagination] = useState<PaginationInfo | null>(null)
   const [currentPage, setCurrentPage] = useState(1)
 
+  // Debounce the search box before hitting the backend
+  useEffect(() => {
+    const timeout = setTimeout(() => {
+      setQuery(searchTerm.trim())
+      setCurrentPage(1)
+    }, 300)
+
+    return () => clearTimeout(timeout)
+  }, [searchTerm])
+
   useEffect(() => {
     const fetchJobs = async () => {
       try {
         setLoading(true)
-        const response = await api.get(`/api/jobs/?page=${currentPage}&per_page=9`)
+        const response = await api.get('/api/jobs/', {
+          params: { page: currentPage, per_page: 9, q: query || undefined },
+        })
         setJobs(response.data.jobs)
         setPagination(response.data.pagination)
       } catch (error) {
@@ -51,14 +63,7 @@ export default function Jobs() {
     }
 
     fetchJobs()
-  }, [currentPage])
-
-  // Filter jobs based on search term
-  const filteredJobs = jobs.filter(job => 
-    job.title.toLowerCase().includes(searchTerm.toLowerCase()) ||
-    job.company.toLowerCase().includes(searchTerm.toLowerCase()) ||
-    job.location.toLowerCase().includes(searchTerm.toLowerCase())
-  )
+  }, [currentPage, query])
 
   // Loading skeleton component
   const LoadingSkeleton = () => (
@@ -83,7 +88,7 @@ export default function Jobs() {
         <Search className="absolute left-3 top-1/2 transform -translate-y-1/2 h-5 w-5 text-white/50" />
         <Input
           type="text"
-          placeholder="Search jobs by title, company, or location..."
+          placeholder="Search jobs by title, company, location, or skills..."
           className="pl-10 bg-dark3 border-dark4 text-white"
           value={searchTerm}
           onChange={(e) => setSearchTerm(e.target.value)}
@@ -93,8 +98,8 @@ export default function Jobs() {
       <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
         {loading ? (
           <LoadingSkeleton />
-        ) : filteredJobs.length > 0 ? (
-          filteredJobs.map((job) => (
+        ) : jobs.length > 0 ? (
+          jobs.map((job) => (
             <JobCard
               key={job.id}
               id={job.id.toString()}
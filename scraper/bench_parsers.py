@@ -0,0 +1,113 @@
+"""
+Benchmarks the parser backends on listing pages of both sites and checks
+that each one extracts exactly the jobs the reference parse does.
+
+The pages in fixtures/ are synthetic: generated markup with each board's
+card structure and class names, page noise and placeholder text, not
+recordings of the live sites. They catch regressions in the parsers and
+compare backends relative to each other; for figures that hold for the real
+boards, save real listing pages and pass their directory with --fixtures
+(files named cutshort*.html and topstartups*.html).
+
+    python bench_parsers.py [--repeat 20] [--fixtures fixtures/]
+
+Reports, per site and backend, the time to build the tree alone (tree
+ms/page) and to build it and extract every job (ms/page, ms/card), and
+exits non-zero if any backend's job dicts differ from the html.parser
+full-tree reference.
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+from cutshort_scraper import MAIN_CONTAINER_CLASS, parse_cutshort_page
+from parsing import BACKENDS, REFERENCE_BACKEND, card_strainer, make_soup
+from topstartups_scraper import JOB_CARD_CLASS, parse_topstartups_page
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# site -> (fixture file prefix, strainer, parse function taking (content, backend, strain))
+SITES = {
+    'cutshort': (
+        'cutshort',
+        card_strainer('div', MAIN_CONTAINER_CLASS),
+        lambda content, backend, strain: parse_cutshort_page(content, backend, strain),
+    ),
+    'topstartups': (
+        'topstartups',
+        card_strainer('div', JOB_CARD_CLASS),
+        lambda content, backend, strain: parse_topstartups_page(content, 0, backend, strain),
+    ),
+}
+
+CONFIGS = [(backend, strain) for backend in BACKENDS for strain in (False, True)]
+
+
+def _comparable(jobs):
+    # Scrape timestamps differ between any two parses
+    return [{key: value for key, value in job.items() if not isinstance(value, datetime)} for job in jobs]
+
+
+def _fixtures(directory, prefix):
+    names = sorted(name for name in os.listdir(directory) if name.startswith(prefix) and name.endswith('.html'))
+    pages = []
+    for name in names:
+        with open(os.path.join(directory, name), 'rb') as f:
+            pages.append(f.read())
+    return pages
+
+
+def _ms_per_round(func, pages, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for page in pages:
+            func(page)
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def bench_site(strainer, parse, pages, repeat):
+    """
+    Returns {(backend, strain): (tree_ms_per_page, ms_per_page, ms_per_card,
+    identical)} for every configuration, compared with the reference one.
+    """
+    reference = [_comparable(parse(page, REFERENCE_BACKEND, False)) for page in pages]
+    cards = sum(len(jobs) for jobs in reference)
+    results = {}
+    for backend, strain in CONFIGS:
+        identical = [_comparable(parse(page, backend, strain)) for page in pages] == reference
+        parse_only = strainer if strain else None
+        tree_ms = _ms_per_round(lambda page: make_soup(page, backend, parse_only), pages, repeat)
+        total_ms = _ms_per_round(lambda page: parse(page, backend, strain), pages, repeat)
+        results[(backend, strain)] = (
+            tree_ms / len(pages), total_ms / len(pages), total_ms / max(cards, 1), identical
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--fixtures', default=FIXTURES_DIR)
+    args = parser.parse_args()
+
+    all_identical = True
+    print(f"{'site':<12} {'backend':<12} {'strained':<9} {'tree ms/page':>13} {'ms/page':>9} {'ms/card':>9}  output")
+    for site, (prefix, strainer, parse) in SITES.items():
+        pages = _fixtures(args.fixtures, prefix)
+        if not pages:
+            print(f"{site:<12} no fixtures in {args.fixtures}")
+            continue
+        results = bench_site(strainer, parse, pages, args.repeat)
+        for (backend, strain), (tree_ms, per_page, per_card, identical) in results.items():
+            all_identical = all_identical and identical
+            print(
+                f"{site:<12} {backend:<12} {'yes' if strain else 'no':<9} {tree_ms:>13.2f} {per_page:>9.2f} "
+                f"{per_card:>9.3f}  {'identical' if identical else 'DIFFERS'}"
+            )
+    return 0 if all_identical else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
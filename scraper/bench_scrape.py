@@ -0,0 +1,208 @@
+"""
+Offline end-to-end benchmark and regression check of the scrape pipeline.
+
+    python bench_scrape.py [--pages 45] [--latency 0.05] [--concurrency 4] [--rate 50]
+                           [--workers N] [--dsn postgresql:///jobflow_bench] [--update-golden]
+
+Serves the pages in fixtures/ from a local StubServer with the given
+per-response latency, runs every registered source through the pipeline's
+fetch and parse stages (pipeline.stream()) and reports pages/sec, parse
+ms/card and peak RSS. With --dsn it also writes the jobs to that
+database's jobs_job through the production sink (db.upsert_jobs) twice and
+reports rows/sec of the cold insert and of the unchanged rerun; use a
+scratch database migrated with `manage.py migrate`, as the rows stay there.
+
+Every page's jobs are compared with the golden JSON of the fixture it was
+served from (fixtures/golden/), and the run exits non-zero on any
+difference. After an intended extraction change, regenerate them with
+--update-golden and review the diff.
+
+The fixtures are synthetic pages (see their header comments), not
+recordings of the boards: the golden check catches extraction regressions
+and the figures compare revisions of this code, but neither says how the
+live sites parse or how fast they are.
+"""
+import argparse
+import inspect
+import json
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit
+
+from db import SINK_BATCH_SIZE, connect, format_counts, upsert_jobs
+from fetch import FetchStats
+from pipeline import parse_page, stream
+from sources import load_sources
+from stub_server import FIXTURES_DIR, StubServer, StubbedSource
+
+GOLDEN_DIR = os.path.join(FIXTURES_DIR, 'golden')
+
+# Left out of the golden files: scrape timestamps differ on every run, and the
+# 64-value signature is covered by the lsh_buckets derived from it
+VOLATILE_FIELDS = ('created_at', 'updated_at', 'first_seen_at', 'last_seen_at', 'minhash')
+
+
+def _comparable(jobs):
+    return [{key: value for key, value in job.items() if key not in VOLATILE_FIELDS} for job in jobs]
+
+
+def _golden_path(fixture):
+    return os.path.join(GOLDEN_DIR, os.path.splitext(os.path.basename(fixture))[0] + '.json')
+
+
+def _bench_sources(base_url, pages, concurrency, rate):
+    """Every registered source, pointed at the stub and sized to `pages` where it is paginated."""
+    for _, cls in sorted(load_sources().items()):
+        source = cls(num_pages=pages) if 'num_pages' in inspect.signature(cls).parameters else cls()
+        source.concurrency = concurrency
+        source.rate = rate
+        source.burst = concurrency
+        yield StubbedSource(source, base_url)
+
+
+def _peak_rss_mb():
+    # ru_maxrss is in KiB on Linux; children is the largest parser process
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    return own, children
+
+
+def fetch_and_parse(stub, sources, workers):
+    """
+    Runs the pipeline's fetch and parse stages against the stub.
+
+    Returns:
+        tuple: (pages, seconds, fetch stats) where pages is a list of
+               (source name, page, fixture path, content, jobs).
+    """
+    fetch_stats = {source.name: FetchStats() for source in sources}
+    pages = []
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        for kind, source, page, url, response, value in stream(sources, executor, fetch_stats=fetch_stats):
+            if kind != 'changed':
+                print(f"[{source.name}] Page {page} {kind}: {value}")
+                continue
+            parts = urlsplit(url)
+            fixture = stub.fixture(f"{parts.path}?{parts.query}")
+            jobs, _ = value.result()
+            pages.append((source.name, page, fixture, response.content, jobs))
+    return pages, time.perf_counter() - started, fetch_stats
+
+
+def parse_ms_per_card(pages, repeat=3):
+    """Serial parse + normalize time per card over the distinct fixtures."""
+    distinct = {fixture: (name, page, content) for name, page, fixture, content, _ in pages}
+    cards = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for name, page, content in distinct.values():
+            cards += len(parse_page(name, content, page)[0])
+    return (time.perf_counter() - started) * 1000 / max(cards, 1)
+
+
+def check_golden(pages, update=False):
+    """
+    Compares every page's jobs with its fixture's golden JSON, or rewrites
+    the golden files from them. Returns a list of mismatch descriptions.
+    """
+    by_fixture = {}
+    mismatches = []
+    for name, page, fixture, _, jobs in pages:
+        comparable = _comparable(jobs)
+        if by_fixture.setdefault(fixture, comparable) != comparable:
+            mismatches.append(f"{name} page {page}: differs from another page served from {fixture}")
+    if update:
+        os.makedirs(GOLDEN_DIR, exist_ok=True)
+        for fixture, jobs in by_fixture.items():
+            with open(_golden_path(fixture), 'w') as f:
+                json.dump(jobs, f, indent=2, ensure_ascii=False)
+                f.write('\n')
+        return mismatches
+    for fixture, jobs in sorted(by_fixture.items()):
+        path = _golden_path(fixture)
+        if not os.path.exists(path):
+            mismatches.append(f"{os.path.basename(fixture)}: no golden file {path}")
+            continue
+        with open(path) as f:
+            golden = json.load(f)
+        if jobs != golden:
+            changed = sum(1 for a, b in zip(jobs, golden) if a != b) + abs(len(jobs) - len(golden))
+            mismatches.append(
+                f"{os.path.basename(fixture)}: {changed} of {len(golden)} jobs differ from {os.path.basename(path)}"
+            )
+    return mismatches
+
+
+def bench_db(dsn, pages):
+    """
+    Upserts every page's jobs twice into the database at `dsn`. Apply links
+    get a per-page suffix so repeated fixtures still make distinct rows.
+
+    Returns:
+        list: (label, rows, seconds, counts) for the insert and the rerun.
+    """
+    jobs = [
+        {**job, 'apply_link': f"{job['apply_link']}?bench={name}-{page}"}
+        for name, page, _, _, page_jobs in pages
+        for job in page_jobs
+    ]
+    conn = connect(dsn)
+    results = []
+    try:
+        for label in ('insert', 'unchanged'):
+            started = time.perf_counter()
+            counts = upsert_jobs(conn, jobs, batch_size=SINK_BATCH_SIZE)
+            results.append((label, len(jobs), time.perf_counter() - started, counts))
+    finally:
+        conn.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, default=45, help="Pages per paginated source.")
+    parser.add_argument('--latency', type=float, default=0.05, help="Seconds per stub response.")
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--rate', type=float, default=50.0, help="Requests per second per source.")
+    parser.add_argument('--workers', type=int, default=None, help="Parser processes (default: CPU count).")
+    parser.add_argument('--dsn', default=None, help="Scratch Postgres database for the DB stage.")
+    parser.add_argument('--update-golden', action='store_true')
+    args = parser.parse_args()
+
+    with StubServer(latency=args.latency) as stub:
+        sources = list(_bench_sources(stub.url, args.pages, args.concurrency, args.rate))
+        pages, seconds, fetch_stats = fetch_and_parse(stub, sources, args.workers)
+
+    cards = sum(len(jobs) for *_, jobs in pages)
+    print(f"{'pages':>6} {'jobs':>6} {'seconds':>8} {'pages/s':>8} {'parse ms/card':>14}")
+    print(f"{len(pages):>6} {cards:>6} {seconds:>8.2f} {len(pages) / seconds:>8.1f} {parse_ms_per_card(pages):>14.3f}")
+    for name, stats in sorted(fetch_stats.items()):
+        print(f"[{name}] Fetch: {stats.report()}.")
+
+    if args.dsn:
+        for label, rows, db_seconds, counts in bench_db(args.dsn, pages):
+            print(f"DB {label}: {rows} rows in {db_seconds:.2f}s, {rows / db_seconds:.0f} rows/s ({format_counts(counts)}).")
+    else:
+        print("DB stage skipped (no --dsn).")
+
+    own, children = _peak_rss_mb()
+    print(f"Peak RSS: {own:.0f} MB main process, {children:.0f} MB largest parser process.")
+
+    mismatches = check_golden(pages, update=args.update_golden)
+    if args.update_golden:
+        print(f"Golden files written to {GOLDEN_DIR}.")
+    for mismatch in mismatches:
+        print(f"MISMATCH {mismatch}")
+    expected = sum(1 for source in sources for _ in source.pages())
+    if len(pages) != expected:
+        mismatches.append(f"{expected - len(pages)} pages not fetched")
+        print(f"MISMATCH {expected - len(pages)} of {expected} pages were not fetched")
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
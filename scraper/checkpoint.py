@@ -0,0 +1,98 @@
+"""
+Per-run checkpoint of the scrape pipeline.
+
+Every page the pipeline finishes is recorded in a small JSON file, with its
+outcome, job count and error, as soon as its jobs are committed. A run that
+stops early (crash, deploy, Ctrl-C) leaves the file behind, and
+`pipeline.py --resume` then skips the pages that already completed and only
+fetches the rest and the ones that failed. A run with no failed pages
+removes the file.
+"""
+import json
+import os
+import uuid
+from datetime import datetime
+
+DEFAULT_PATH = os.environ.get(
+    'SCRAPER_CHECKPOINT_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'checkpoint.json')
+)
+
+# Page outcomes
+OK = 'ok'                # jobs parsed and committed
+UNCHANGED = 'unchanged'  # skipped by the page cache, jobs touched
+FAILED = 'failed'        # fetch, parse or write error
+
+DONE = (OK, UNCHANGED)
+
+
+class Checkpoint:
+    """
+    The pages of one run, by source and URL, persisted after every change.
+
+    Args:
+        path (str, optional): The checkpoint file.
+        resume (bool, optional): Continue the run left in `path`, if any,
+            instead of starting a new one.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, resume=False):
+        self.path = path
+        self.state = None
+        if resume and os.path.exists(path):
+            with open(path) as f:
+                self.state = json.load(f)
+        self.resumed = self.state is not None
+        if self.state is None:
+            self.state = {'run_id': uuid.uuid4().hex, 'started_at': datetime.now().isoformat(), 'sources': {}}
+
+    @property
+    def run_id(self):
+        return self.state['run_id']
+
+    def completed(self, source_name):
+        """Returns the URLs of `source_name` that need no refetch in this run."""
+        pages = self.state['sources'].get(source_name, {})
+        return {url for url, entry in pages.items() if entry['status'] in DONE}
+
+    def record(self, source_name, url, page, status, jobs=0, error=None):
+        """Records the outcome of one page and writes the checkpoint."""
+        self.state['sources'].setdefault(source_name, {})[url] = {
+            'page': page,
+            'status': status,
+            'jobs': jobs,
+            'error': str(error) if error is not None else None,
+            'at': datetime.now().isoformat(),
+        }
+        self._save()
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # Written aside and renamed, so a crash never leaves half a file
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.path)
+
+    def failed(self):
+        """Returns (source name, page, error) for every failed page."""
+        return [
+            (name, entry['page'], entry['error'])
+            for name, pages in self.state['sources'].items()
+            for entry in pages.values()
+            if entry['status'] == FAILED
+        ]
+
+    def report(self):
+        """Per-page outcome table of the run, one line per page."""
+        lines = [f"Run {self.run_id}{' (resumed)' if self.resumed else ''}:"]
+        for name, pages in sorted(self.state['sources'].items()):
+            entries = sorted(pages.values(), key=lambda entry: str(entry['page']).zfill(8))
+            for entry in entries:
+                error = f"  {entry['error']}" if entry['error'] else ''
+                lines.append(f"  {name:<12} page {entry['page']!s:>4}  {entry['status']:<9} {entry['jobs']:>5} jobs{error}")
+        return '\n'.join(lines)
+
+    def finish(self):
+        """Removes the checkpoint when every page completed, else keeps it for --resume."""
+        if not self.failed() and os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,240 @@
+"""
+Database helpers shared by the scrapers.
+"""
+import hashlib
+import io
+import json
+import os
+from datetime import datetime
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+JOBS_TABLE = 'jobs_job'
+
+# Columns an upsert never overwrites: the conflict key, and the times the
+# job was first scraped (see jobs.models.Job.first_seen_at).
+INSERT_ONLY_COLUMNS = ('apply_link', 'created_at', 'first_seen_at')
+
+# Scraped fields that make up a job's content; the parsed ranges, dedup
+# signature and timestamps are all derived from these or from the run.
+CONTENT_FIELDS = ('title', 'company', 'location', 'description', 'tags', 'pay', 'experience')
+
+# Rows per transaction in upsert_jobs(), and per statement in its
+# execute_values fallback.
+SINK_BATCH_SIZE = 5000
+VALUES_PAGE_SIZE = 1000
+
+COPY_NULL = '\\N'
+
+# Staged rows whose job is stored with the same content hash. They would be
+# skipped by the upsert anyway, but only after paying for its triggers.
+DROP_UNCHANGED_SQL = f"""
+DELETE FROM jobs_staging AS staged USING {JOBS_TABLE} AS job
+WHERE job.apply_link = staged.apply_link AND job.content_hash = staged.content_hash
+"""
+
+# The same check for the execute_values path, which has no staging table
+UNCHANGED_LINKS_SQL = f"""
+SELECT job.apply_link FROM {JOBS_TABLE} AS job
+JOIN unnest(%s::text[], %s::text[]) AS scraped (apply_link, content_hash)
+  ON job.apply_link = scraped.apply_link AND job.content_hash = scraped.content_hash
+"""
+
+# Single-row counter read by the backend to build ETags and cache keys
+# (jobs.models.DataVersion). Bumped once per committed ingest.
+DATA_VERSION_SQL = """
+INSERT INTO jobs_dataversion (id, version, updated_at) VALUES (1, 1, NOW())
+ON CONFLICT (id) DO UPDATE SET version = jobs_dataversion.version + 1, updated_at = NOW();
+"""
+
+# Only rows that were inserted or really changed come back. xmax is 0 only on
+# a freshly inserted row version, which tells inserts from updates.
+RETURNING_SQL = "RETURNING apply_link, (xmax = 0) AS inserted"
+
+# Unchanged jobs were skipped by the upsert, but were still seen in this run
+TOUCH_UNCHANGED_SQL = "UPDATE jobs_job SET last_seen_at = %s WHERE apply_link = ANY(%s) AND last_seen_at < %s"
+
+
+def connect(dsn=None):
+    """
+    Opens a psycopg2 connection to `dsn`, or else from the DB_USER,
+    DB_PASSWORD, DB_HOST, DB_PORT and DB_NAME environment variables (loaded
+    from .env by the entry points).
+
+    Raises:
+        ValueError: If a connection parameter is missing or empty.
+    """
+    if dsn:
+        return psycopg2.connect(dsn)
+    params = {
+        'user': os.environ.get('DB_USER'),
+        'password': os.environ.get('DB_PASSWORD'),
+        'host': os.environ.get('DB_HOST'),
+        'port': os.environ.get('DB_PORT'),
+        'dbname': os.environ.get('DB_NAME'),
+    }
+    if not all(params.values()):
+        raise ValueError("Database connection parameters are incomplete. Check your .env file.")
+    return psycopg2.connect(**params)
+
+
+def bump_data_version(conn):
+    """
+    Marks the jobs dataset as changed so API clients and caches refetch it.
+
+    Args:
+        conn: An open psycopg2 connection. The bump is committed immediately.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(DATA_VERSION_SQL)
+    conn.commit()
+
+
+def content_hash(job):
+    """
+    Returns a hex digest of the job's CONTENT_FIELDS, with whitespace
+    collapsed so re-rendered markup with the same text hashes the same.
+    """
+    values = [' '.join(str(job.get(field) or '').split()) for field in CONTENT_FIELDS]
+    return hashlib.blake2b(json.dumps(values).encode(), digest_size=16).hexdigest()
+
+
+def _conflict_clause(columns):
+    update_clause = ", ".join(
+        f"{col} = EXCLUDED.{col}" for col in columns if col not in INSERT_ONLY_COLUMNS
+    )
+    # Unchanged rows are not rewritten: no dead tuple, no WAL or index work. The
+    # BEFORE INSERT triggers still run on every proposed row, as the conflict is
+    # only found after them, so the batches drop unchanged rows before this.
+    return (
+        f"ON CONFLICT (apply_link) DO UPDATE SET {update_clause} "
+        f"WHERE {JOBS_TABLE}.content_hash IS DISTINCT FROM EXCLUDED.content_hash"
+    )
+
+
+def _array_element(item):
+    if item is None:
+        return 'NULL'
+    # Quoted so commas, braces and colons inside text elements are safe
+    return '"' + str(item).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def _copy_value(value):
+    """Formats one value as a CSV field for COPY, with None as COPY_NULL."""
+    if value is None:
+        return COPY_NULL
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        if value and type(value[0]) is int:
+            # Signatures: no quoting needed, and this path is the hot one
+            return '"{' + ','.join(map(str, value)) + '}"'
+        text = '{' + ','.join(map(_array_element, value)) + '}'
+    else:
+        text = str(value)
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _copy_buffer(rows):
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(','.join(_copy_value(value) for value in row))
+        buffer.write('\n')
+    buffer.seek(0)
+    return buffer
+
+
+def _upsert_batch_copy(cursor, columns, rows):
+    column_list = ', '.join(columns)
+    # Same column types as jobs_job, but none of its constraints or indexes
+    cursor.execute(
+        f"CREATE TEMP TABLE jobs_staging ON COMMIT DROP AS SELECT {column_list} FROM {JOBS_TABLE} WITH NO DATA"
+    )
+    cursor.copy_expert(
+        f"COPY jobs_staging ({column_list}) FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')",
+        _copy_buffer(rows),
+    )
+    cursor.execute(DROP_UNCHANGED_SQL)
+    cursor.execute(
+        f"INSERT INTO {JOBS_TABLE} ({column_list}) SELECT {column_list} FROM jobs_staging "
+        f"{_conflict_clause(columns)} {RETURNING_SQL}"
+    )
+    return cursor.fetchall()
+
+
+def _upsert_batch_values(cursor, columns, rows):
+    link_index, hash_index = columns.index('apply_link'), columns.index('content_hash')
+    cursor.execute(UNCHANGED_LINKS_SQL, ([row[link_index] for row in rows], [row[hash_index] for row in rows]))
+    unchanged_links = {apply_link for apply_link, in cursor.fetchall()}
+    rows = [row for row in rows if row[link_index] not in unchanged_links]
+    if not rows:
+        return []
+    return execute_values(
+        cursor,
+        f"INSERT INTO {JOBS_TABLE} ({', '.join(columns)}) VALUES %s {_conflict_clause(columns)} {RETURNING_SQL}",
+        rows,
+        page_size=VALUES_PAGE_SIZE,
+        fetch=True,
+    )
+
+
+def upsert_jobs(conn, jobs, method='copy', batch_size=SINK_BATCH_SIZE):
+    """
+    Writes scraped jobs to jobs_job with one set-based upsert per batch.
+
+    With method='copy' each batch is streamed with COPY into a temporary
+    staging table and merged by a single INSERT ... SELECT ... ON CONFLICT;
+    method='values' sends multi-row VALUES statements through execute_values
+    instead. Each batch is one transaction.
+
+    Every job gets a content_hash, and existing rows with the same hash are
+    left as they are apart from last_seen_at. Such jobs are dropped from the
+    batch before the upsert, so they do not run its triggers either.
+
+    Args:
+        conn: An open psycopg2 connection.
+        jobs (list): Job dicts, all with the same keys. When several share an
+            apply_link, the last one wins.
+        method (str, optional): 'copy' or 'values'.
+        batch_size (int, optional): Rows per transaction.
+
+    Returns:
+        dict: 'inserted', 'updated' and 'unchanged' row counts, and
+              'modified_links', the apply links of the inserted and updated rows.
+    """
+    # ON CONFLICT cannot touch the same row twice in one statement
+    unique_jobs = list({job['apply_link']: {**job, 'content_hash': content_hash(job)} for job in jobs}.values())
+    counts = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'modified_links': []}
+    if not unique_jobs:
+        return counts
+
+    columns = list(unique_jobs[0].keys())
+    upsert_batch = _upsert_batch_copy if method == 'copy' else _upsert_batch_values
+    for start in range(0, len(unique_jobs), batch_size):
+        batch = unique_jobs[start:start + batch_size]
+        rows = [[job[col] for col in columns] for job in batch]
+        try:
+            with conn.cursor() as cursor:
+                modified = upsert_batch(cursor, columns, rows)
+                modified_links = {apply_link for apply_link, _ in modified}
+                unchanged_links = [job['apply_link'] for job in batch if job['apply_link'] not in modified_links]
+                if unchanged_links:
+                    seen_at = max(job.get('last_seen_at') or datetime.now() for job in batch)
+                    cursor.execute(TOUCH_UNCHANGED_SQL, (seen_at, unchanged_links, seen_at))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        inserted = sum(1 for _, was_inserted in modified if was_inserted)
+        counts['inserted'] += inserted
+        counts['updated'] += len(modified) - inserted
+        counts['unchanged'] += len(unchanged_links)
+        counts['modified_links'].extend(modified_links)
+    return counts
+
+
+def format_counts(counts):
+    return f"{counts['inserted']} inserted, {counts['updated']} updated, {counts['unchanged']} unchanged"
@@ -0,0 +1,166 @@
+"""
+Near-duplicate detection for scraped jobs.
+
+Exact duplicates are caught by ON CONFLICT (apply_link) once tracking
+parameters are stripped from the link. Near duplicates (the same role posted
+on both boards, or re-posted under a new URL) are caught with MinHash
+signatures over the normalized title, company and description. The
+signatures are banded into LSH buckets stored in jobs_job.lsh_buckets,
+which is GIN-indexed, so each job is only compared with the few jobs that
+share a bucket with it.
+"""
+import hashlib
+import re
+import random
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+NUM_PERMUTATIONS = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+
+# Estimated Jaccard similarity at or above which two jobs are the same posting.
+DUPLICATE_THRESHOLD = 0.8
+
+SHINGLE_SIZE = 3
+MERSENNE_PRIME = (1 << 61) - 1
+
+# Fixed seed: signatures must be comparable across runs.
+_rng = random.Random(1729)
+PERMUTATIONS = [
+    (_rng.randrange(1, MERSENNE_PRIME), _rng.randrange(0, MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+TRACKING_PARAMS = {'ref', 'referrer', 'source', 'src', 'fbclid', 'gclid', 'trk', 'mc_cid', 'mc_eid'}
+HTML_TAG_RE = re.compile(r'<[^>]+>')
+WORD_RE = re.compile(r'[a-z0-9]+')
+
+
+def canonicalize_url(url):
+    """
+    Normalizes an apply link so tracking variants of one URL compare equal.
+
+    Lowercases the scheme and host, drops the fragment, utm_* and other
+    tracking parameters and any trailing slash, and sorts the query.
+
+    Args:
+        url (str): The scraped apply link.
+
+    Returns:
+        str: The canonical link, or the input unchanged if it is not a URL.
+    """
+    try:
+        parts = urlsplit(url.strip())
+    except (AttributeError, ValueError):
+        return url
+    if not parts.scheme or not parts.netloc:
+        return url
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ''))
+
+
+def _shingles(text):
+    words = WORD_RE.findall(HTML_TAG_RE.sub(' ', text).lower())
+    if len(words) <= SHINGLE_SIZE:
+        return {' '.join(words)}
+    return {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash_signature(title, company, description):
+    """
+    Computes the MinHash signature of a job.
+
+    Args:
+        title (str), company (str), description (str): Scraped fields; the
+            description may be HTML, though its plain text is preferred.
+
+    Returns:
+        list: NUM_PERMUTATIONS ints below 2**61, so they fit a bigint column.
+    """
+    text = ' '.join(part or '' for part in (title, company, description))
+    hashes = [
+        int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), 'big')
+        for shingle in _shingles(text)
+    ]
+    return [
+        min((a * value + b) % MERSENNE_PRIME for value in hashes)
+        for a, b in PERMUTATIONS
+    ]
+
+
+def lsh_buckets(signature):
+    """Bands a signature into BANDS bucket keys of ROWS_PER_BAND rows each."""
+    buckets = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = hashlib.md5(repr(rows).encode()).hexdigest()[:12]
+        buckets.append(f"{band}:{digest}")
+    return buckets
+
+
+def add_dedup_fields(job):
+    """
+    Canonicalizes the job's apply link and attaches its MinHash signature
+    and LSH buckets, in place.
+    """
+    job['apply_link'] = canonicalize_url(job['apply_link'])
+    description = job.get('description_text') or job['description']
+    job['minhash'] = minhash_signature(job['title'], job['company'], description)
+    job['lsh_buckets'] = lsh_buckets(job['minhash'])
+    return job
+
+
+# For every job upserted in this run, find the oldest job that shares an LSH
+# bucket with it and whose signature agrees in enough positions, and point
+# the job at that job's canonical. Candidates come from the GIN index on
+# lsh_buckets, so no pairwise scan is needed.
+LINK_DUPLICATES_SQL = """
+UPDATE jobs_job AS duplicate
+SET canonical_job_id = best.canonical_id
+FROM (
+    SELECT DISTINCT ON (job.id) job.id AS job_id, COALESCE(candidate.canonical_job_id, candidate.id) AS canonical_id
+    FROM jobs_job AS job
+    JOIN jobs_job AS candidate
+      ON candidate.lsh_buckets && job.lsh_buckets AND candidate.id < job.id
+    WHERE job.apply_link = ANY(%(apply_links)s)
+      AND (
+          SELECT COUNT(*) FROM unnest(job.minhash, candidate.minhash) AS pair(a, b) WHERE a = b
+      ) >= %(min_matches)s
+    ORDER BY job.id, candidate.id
+) AS best
+WHERE duplicate.id = best.job_id;
+"""
+
+RESET_LINKS_SQL = "UPDATE jobs_job SET canonical_job_id = NULL WHERE apply_link = ANY(%(apply_links)s);"
+
+
+def link_near_duplicates(conn, apply_links):
+    """
+    Links the jobs just upserted under `apply_links` to their canonical job.
+
+    Args:
+        conn: An open psycopg2 connection. The linking is committed in one
+            transaction.
+        apply_links (list): Canonical apply links of the jobs written this run.
+
+    Returns:
+        int: Number of jobs marked as duplicates.
+    """
+    if not apply_links:
+        return 0
+    params = {
+        'apply_links': list(apply_links),
+        'min_matches': int(DUPLICATE_THRESHOLD * NUM_PERMUTATIONS),
+    }
+    with conn.cursor() as cursor:
+        # Content may have changed since the last run, so links are recomputed
+        cursor.execute(RESET_LINKS_SQL, params)
+        cursor.execute(LINK_DUPLICATES_SQL, params)
+        linked = cursor.rowcount
+    conn.commit()
+    return linked
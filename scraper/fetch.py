@@ -0,0 +1,350 @@
+"""
+Concurrent, rate-limited page fetching shared by the scrapers.
+
+Pages are fetched on a thread pool through one pooled keep-alive
+requests.Session, while a token bucket per host caps the request rate, so
+a run takes about len(urls) / rate seconds however slow each response is.
+
+Every request has a connect and a read timeout. Connection errors, timeouts
+and 429/5xx responses are retried with jittered exponential backoff (or
+after the server's Retry-After), and a per-host circuit breaker stops
+hammering a host that keeps failing, so a run always ends in bounded time.
+"""
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from metrics import Stats
+
+DEFAULT_CONCURRENCY = 4
+# The scrapers' original pacing (a 2 s sleep between sequential requests);
+# boards that tolerate more can be given a higher --rate explicitly.
+DEFAULT_RATE = 0.5  # requests per second per host
+DEFAULT_BURST = 1
+USER_AGENT = "Mozilla/5.0 (compatible; jobflow-scraper)"
+DEFAULT_TIMEOUT = (5, 30)  # connect, read seconds
+
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5  # seconds before the first retry, doubled on each one
+MAX_BACKOFF = 30.0     # also caps Retry-After, to keep runs bounded
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Transport errors worth another attempt; any other RequestException (too many
+# redirects, an invalid URL) fails the page at once. Both count against the host.
+RETRY_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+    requests.exceptions.ContentDecodingError,
+)
+
+BREAKER_WINDOW = 30         # last requests per host the breaker looks at
+BREAKER_MIN_REQUESTS = 15   # requests in the window before it can open
+BREAKER_FAILURE_RATIO = 0.7  # failed share of the window that opens it
+BREAKER_COOLDOWN = 60.0     # seconds before a trial request is let through
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of sending a request to a host whose circuit is open."""
+
+
+class TokenBucket:
+    """
+    Classic token bucket: `rate` tokens per second accrue up to `burst`, and
+    every request takes one, sleeping until one is available. Thread-safe.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class HostRateLimiter:
+    """Hands out one TokenBucket per host, created on first use."""
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST):
+        self.rate = rate
+        self.burst = burst
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, url):
+        host = urlsplit(url).netloc
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = self.buckets[host] = TokenBucket(self.rate, self.burst)
+        bucket.acquire()
+
+
+def _retry_after(response):
+    """Returns the response's Retry-After in seconds, or None."""
+    value = response.headers.get('Retry-After') if response is not None else None
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """
+    Which failures are retried, how often, and how long to wait in between.
+
+    Waits use "full jitter": a uniform draw from [0, backoff * 2**attempt],
+    capped at max_backoff, so clients that failed together do not retry
+    together. A Retry-After header overrides the draw (up to max_backoff).
+    """
+
+    def __init__(self, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, max_backoff=MAX_BACKOFF,
+                 statuses=RETRY_STATUSES):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.statuses = statuses
+
+    def delay(self, attempt, response=None):
+        retry_after = _retry_after(response)
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff)
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker over a sliding window of the host's last
+    `window` requests. Once at least `min_requests` are in the window and
+    `failure_ratio` of them failed, the circuit opens and requests fail fast
+    for `cooldown` seconds; then a single trial request is let through,
+    which closes the circuit on success and reopens it on failure. A ratio
+    rather than a run of consecutive failures, so a flaky host whose retries
+    succeed stays open for business. Thread-safe.
+
+    The trial belongs to the thread that was let through; if it ends
+    without recording an outcome, release() frees it for the next one.
+    """
+
+    def __init__(self, window=BREAKER_WINDOW, min_requests=BREAKER_MIN_REQUESTS,
+                 failure_ratio=BREAKER_FAILURE_RATIO, cooldown=BREAKER_COOLDOWN):
+        self.window = window
+        self.min_requests = min_requests
+        self.failure_ratio = failure_ratio
+        self.cooldown = cooldown
+        self.hosts = {}  # host -> {'outcomes', 'opened_at', 'trial' (thread id or None)}
+        self.lock = threading.Lock()
+
+    def _host(self, url):
+        host = urlsplit(url).netloc
+        state = self.hosts.get(host)
+        if state is None:
+            state = self.hosts[host] = {'outcomes': deque(maxlen=self.window), 'opened_at': None, 'trial': None}
+        return state
+
+    def allow(self, url):
+        with self.lock:
+            state = self._host(url)
+            if state['opened_at'] is None:
+                return True
+            if state['trial'] is not None or time.monotonic() - state['opened_at'] < self.cooldown:
+                return False
+            state['trial'] = threading.get_ident()
+            return True
+
+    def success(self, url):
+        with self.lock:
+            state = self._host(url)
+            state['outcomes'].append(True)
+            state.update(opened_at=None, trial=None)
+
+    def failure(self, url):
+        with self.lock:
+            state = self._host(url)
+            outcomes = state['outcomes']
+            outcomes.append(False)
+            failed = outcomes.count(False)
+            if state['trial'] is not None or (
+                len(outcomes) >= self.min_requests and failed >= self.failure_ratio * len(outcomes)
+            ):
+                outcomes.clear()
+                state.update(opened_at=time.monotonic(), trial=None)
+
+    def release(self, url):
+        """Frees the calling thread's trial of `url`'s host, if it still holds one."""
+        with self.lock:
+            state = self._host(url)
+            if state['trial'] == threading.get_ident():
+                state['trial'] = None
+
+
+class FetchStats(Stats):
+    """Request, retry and failure counters and fetch stage timers of one fetch_all() run."""
+
+    def report(self):
+        counts = self.counts
+        statuses = ', '.join(
+            f"{key[len('status_'):]}: {n}" for key, n in sorted(counts.items()) if key.startswith('status_')
+        )
+        return (
+            f"{counts['requests']} requests, {counts['retries']} retries, {counts['timeouts']} timeouts, "
+            f"{counts['short_circuited']} short-circuited, {counts['failures']} failed pages"
+            + (f" (statuses {statuses})" if statuses else "")
+        )
+
+
+def _timed_pool(pool_cls, connection_cls, stats):
+    """A connection pool class whose new connections record fetch_connect in `stats`."""
+
+    class TimedConnection(connection_cls):
+        def connect(self):
+            with stats.timer('fetch_connect'):
+                super().connect()
+
+    return type(f"Timed{pool_cls.__name__}", (pool_cls,), {'ConnectionCls': TimedConnection})
+
+
+class _TimedAdapter(HTTPAdapter):
+    def __init__(self, stats, **kwargs):
+        # Set first: HTTPAdapter.__init__ calls init_poolmanager()
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _timed_pool(HTTPConnectionPool, HTTPConnection, self.stats),
+            'https': _timed_pool(HTTPSConnectionPool, HTTPSConnection, self.stats),
+        }
+
+
+def make_session(pool_size=DEFAULT_CONCURRENCY, stats=None):
+    """
+    Returns a requests.Session whose connection pool is large enough for
+    `pool_size` concurrent requests per host, so connections are kept alive
+    and reused instead of being opened per page. With `stats`, the time
+    spent opening connections is recorded as its fetch_connect stage.
+    """
+    session = requests.Session()
+    if stats is not None:
+        adapter = _TimedAdapter(stats, pool_connections=pool_size, pool_maxsize=pool_size)
+    else:
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['User-Agent'] = USER_AGENT
+    return session
+
+
+def fetch_all(urls, session=None, concurrency=DEFAULT_CONCURRENCY, limiter=None, timeout=DEFAULT_TIMEOUT,
+              page_cache=None, retry=None, breaker=None, stats=None):
+    """
+    Fetches `urls` concurrently and yields results in completion order, so
+    callers can parse each page as soon as it arrives.
+
+    Args:
+        urls (list): The URLs to fetch.
+        session (requests.Session, optional): Shared session; one is created if omitted.
+        concurrency (int, optional): Maximum requests in flight.
+        limiter (HostRateLimiter, optional): Per-host rate limit; DEFAULT_RATE if omitted.
+        timeout (tuple, optional): (connect, read) timeout in seconds, per attempt.
+        page_cache (PageCache, optional): Makes every request conditional on the
+            validators stored for its URL; 304 responses are yielded as is.
+        retry (RetryPolicy, optional): Retries of failed requests; the defaults if omitted.
+        breaker (CircuitBreaker, optional): Per-host circuit breaker; one is created if omitted.
+        stats (FetchStats, optional): Collects request, retry and failure counts,
+            bytes downloaded and the fetch_wait, fetch_headers and
+            fetch_download stage times.
+
+    Yields:
+        tuple: (url, response, error). `response` has passed raise_for_status();
+               on failure it is None and `error` holds the last exception.
+    """
+    stats = stats or FetchStats()
+    session = session or make_session(concurrency, stats)
+    limiter = limiter or HostRateLimiter()
+    retry = retry or RetryPolicy()
+    breaker = breaker or CircuitBreaker()
+
+    def fetch(url):
+        try:
+            return attempt_fetch(url)
+        finally:
+            # An exception that skipped success()/failure() must not hold the trial
+            breaker.release(url)
+
+    def attempt_fetch(url):
+        headers = page_cache.conditional_headers(url) if page_cache else None
+        for attempt in range(retry.retries + 1):
+            if not breaker.allow(url):
+                stats.add('short_circuited')
+                raise CircuitOpenError(f"Circuit open for {urlsplit(url).netloc}")
+            with stats.timer('fetch_wait'):
+                limiter.acquire(url)
+            stats.add('requests')
+            response = None
+            started = time.perf_counter()
+            try:
+                response = session.get(url, timeout=timeout, headers=headers)
+            except RETRY_ERRORS as e:
+                if isinstance(e, requests.exceptions.Timeout):
+                    stats.add('timeouts')
+                error = e
+            except requests.exceptions.RequestException:
+                breaker.failure(url)
+                raise
+            else:
+                # elapsed stops at the headers; the rest of the call read the body
+                headers_seconds = response.elapsed.total_seconds()
+                stats.observe('fetch_headers', headers_seconds)
+                stats.observe('fetch_download', max(0.0, time.perf_counter() - started - headers_seconds))
+                stats.add('bytes', len(response.content))
+                stats.add(f"status_{response.status_code}")
+                if response.status_code not in retry.statuses:
+                    # The host answered: a 404 is the page's problem, not the host's
+                    breaker.success(url)
+                    response.raise_for_status()
+                    return response
+                error = requests.exceptions.HTTPError(
+                    f"{response.status_code} Server Error for url: {url}", response=response
+                )
+            breaker.failure(url)
+            if attempt < retry.retries:
+                stats.add('retries')
+                time.sleep(retry.delay(attempt, response))
+        raise error
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {executor.submit(fetch, url): url for url in urls}
+        for future in as_completed(futures):
+            url = futures[future]
+            try:
+                yield url, future.result(), None
+            except requests.exceptions.RequestException as e:
+                stats.add('failures')
+                yield url, None, e
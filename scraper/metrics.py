@@ -0,0 +1,170 @@
+"""
+Run instrumentation for the scrape pipeline.
+
+Each part of a run (a source's fetching and parsing, the database sink)
+keeps a Stats: named counters and per-stage timers. At the end the pipeline
+folds them into one run report, written as JSON and, optionally, in the
+Prometheus text format for node_exporter's textfile collector, so daily
+runs can be graphed and compared.
+
+Stages timed, in seconds:
+    fetch_wait      waiting on the per-host rate limiter
+    fetch_connect   DNS, TCP and TLS for each new connection
+    fetch_headers   request sent until the response headers arrived
+    fetch_download  reading the response body
+    parse           building the tree and extracting the cards
+    normalize       normalize.build_job() on the cards
+    db_write        db.upsert_jobs() and touching unchanged pages' jobs
+    db_link         dedup.link_near_duplicates()
+"""
+import json
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+DEFAULT_REPORT_PATH = os.environ.get(
+    'SCRAPER_REPORT_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'run_report.json')
+)
+
+# Report section of run-wide stats that belong to no single source
+RUN_SECTION = 'all'
+
+PROMETHEUS_PREFIX = 'scraper'
+
+
+class Stats:
+    """Thread-safe counters and stage timers of one part of a run."""
+
+    def __init__(self):
+        self.counts = Counter()
+        self.timings = {}  # stage -> [seconds, calls]
+        self.lock = threading.Lock()
+
+    def add(self, key, n=1):
+        with self.lock:
+            self.counts[key] += n
+
+    def observe(self, stage, seconds, calls=1):
+        with self.lock:
+            timing = self.timings.setdefault(stage, [0.0, 0])
+            timing[0] += seconds
+            timing[1] += calls
+
+    @contextmanager
+    def timer(self, stage):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def merge(self, other):
+        """Adds the counters and timings of `other` to this one."""
+        with other.lock:
+            counts = Counter(other.counts)
+            timings = {stage: list(timing) for stage, timing in other.timings.items()}
+        with self.lock:
+            self.counts.update(counts)
+            for stage, (seconds, calls) in timings.items():
+                timing = self.timings.setdefault(stage, [0.0, 0])
+                timing[0] += seconds
+                timing[1] += calls
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'counters': dict(sorted(self.counts.items())),
+                'stages': {
+                    stage: {'seconds': round(seconds, 6), 'calls': calls}
+                    for stage, (seconds, calls) in sorted(self.timings.items())
+                },
+            }
+
+
+def run_report(run_id, started_at, finished_at, sections, pages=None):
+    """
+    Builds the JSON-serializable report of one run.
+
+    Args:
+        run_id (str): The checkpoint's run id.
+        started_at (datetime): When the run started.
+        finished_at (datetime): When it ended.
+        sections (dict): Source name (or RUN_SECTION) -> Stats.
+        pages (dict, optional): Source name -> page outcome -> count.
+    """
+    return {
+        'run_id': run_id,
+        'started_at': started_at.isoformat(),
+        'finished_at': finished_at.isoformat(),
+        'duration_seconds': round((finished_at - started_at).total_seconds(), 3),
+        'pages': pages or {},
+        'sections': {name: stats.snapshot() for name, stats in sorted(sections.items())},
+    }
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def to_prometheus(report):
+    """
+    Renders a run report in the Prometheus text exposition format. Every
+    value is a gauge of the last run, labelled by section (source) and
+    stage or counter name.
+    """
+    p = PROMETHEUS_PREFIX
+    lines = [
+        f"# HELP {p}_last_run_timestamp_seconds End of the last scrape run.",
+        f"# TYPE {p}_last_run_timestamp_seconds gauge",
+        f"{p}_last_run_timestamp_seconds {datetime.fromisoformat(report['finished_at']).timestamp():.3f}",
+        f"# HELP {p}_last_run_duration_seconds Wall time of the last scrape run.",
+        f"# TYPE {p}_last_run_duration_seconds gauge",
+        f"{p}_last_run_duration_seconds {report['duration_seconds']}",
+        f"# HELP {p}_stage_seconds Time spent in each pipeline stage in the last run.",
+        f"# TYPE {p}_stage_seconds gauge",
+    ]
+    sections = report['sections']
+    for name, section in sections.items():
+        for stage, timing in section['stages'].items():
+            lines.append(f'{p}_stage_seconds{{section="{_label(name)}",stage="{_label(stage)}"}} {timing["seconds"]}')
+    lines += [
+        f"# HELP {p}_stage_calls Times each pipeline stage ran in the last run.",
+        f"# TYPE {p}_stage_calls gauge",
+    ]
+    for name, section in sections.items():
+        for stage, timing in section['stages'].items():
+            lines.append(f'{p}_stage_calls{{section="{_label(name)}",stage="{_label(stage)}"}} {timing["calls"]}')
+    lines += [
+        f"# HELP {p}_events Counters of the last run (pages, cards, rows, requests, ...).",
+        f"# TYPE {p}_events gauge",
+    ]
+    for name, section in sections.items():
+        for counter, value in section['counters'].items():
+            lines.append(f'{p}_events{{section="{_label(name)}",event="{_label(counter)}"}} {value}')
+    lines += [
+        f"# HELP {p}_pages Pages of the last run by outcome.",
+        f"# TYPE {p}_pages gauge",
+    ]
+    for name, outcomes in sorted(report['pages'].items()):
+        for outcome, count in sorted(outcomes.items()):
+            lines.append(f'{p}_pages{{section="{_label(name)}",outcome="{_label(outcome)}"}} {count}')
+    return '\n'.join(lines) + '\n'
+
+
+def _write_atomic(path, text):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    # The textfile collector may read at any moment, so never a partial file
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def write_report(report, path=DEFAULT_REPORT_PATH, prometheus_path=None):
+    """Writes the run report as JSON to `path` and, if given, as Prometheus text to `prometheus_path`."""
+    _write_atomic(path, json.dumps(report, indent=2) + '\n')
+    if prometheus_path:
+        _write_atomic(prometheus_path, to_prometheus(report))
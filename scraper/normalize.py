@@ -0,0 +1,345 @@
+"""
+Normalization applied to scraped jobs before they are written to jobs_job.
+
+The pure parsing functions here are also imported by the backend's backfill
+management commands, so they must not depend on anything but the stdlib.
+"""
+import json
+import re
+from datetime import datetime
+from html import escape
+from html.parser import HTMLParser
+
+from dedup import add_dedup_fields
+
+CURRENCY_SYMBOLS = {
+    '₹': 'INR',
+    'rs': 'INR',
+    'inr': 'INR',
+    '$': 'USD',
+    'usd': 'USD',
+    '€': 'EUR',
+    'eur': 'EUR',
+    '£': 'GBP',
+    'gbp': 'GBP',
+}
+
+UNIT_MULTIPLIERS = {
+    'k': 1_000,
+    'l': 100_000,
+    'lpa': 100_000,
+    'lakh': 100_000,
+    'lakhs': 100_000,
+    'lac': 100_000,
+    'lacs': 100_000,
+    'm': 1_000_000,
+    'cr': 10_000_000,
+    'crore': 10_000_000,
+    'crores': 10_000_000,
+}
+
+CURRENCY_RE = re.compile(r'(₹|\$|€|£|\b(?:rs|inr|usd|eur|gbp)\b)', re.IGNORECASE)
+AMOUNT_RE = re.compile(
+    r'(\d+(?:,\d+)*(?:\.\d+)?)\s*(crores?|cr|lakhs?|lacs?|lpa|k|l|m)?(?![a-z])',
+    re.IGNORECASE,
+)
+MONTH_RE = re.compile(r'/\s*mo|per\s+month|monthly|\bpm\b|/\s*month', re.IGNORECASE)
+HOUR_RE = re.compile(r'/\s*h(ou)?r|per\s+hour|hourly', re.IGNORECASE)
+OPEN_ENDED_RE = re.compile(r'\+|≥|>=|above|upwards|onwards', re.IGNORECASE)
+FRESHER_RE = re.compile(r'fresher|entry[\s-]level|no experience', re.IGNORECASE)
+YEARS_RE = re.compile(r'(\d+(?:\.\d+)?)')
+
+# Lakh/crore notation is only used for rupee amounts.
+INDIAN_UNITS = {'l', 'lpa', 'lakh', 'lakhs', 'lac', 'lacs', 'cr', 'crore', 'crores'}
+
+# Pay periods per year, to compare every range as a yearly amount (40h weeks).
+PERIODS_PER_YEAR = {'year': 1, 'month': 12, 'hour': 2080}
+
+EMPTY_PAY = {
+    'pay_min': None, 'pay_max': None, 'pay_currency': None, 'pay_period': None,
+    'pay_yearly_min': None, 'pay_yearly_max': None,
+}
+EMPTY_EXPERIENCE = {'experience_min': None, 'experience_max': None}
+
+
+def parse_pay(text):
+    """
+    Parses a free-text pay string into a numeric range.
+
+    Handles the formats both job boards use, e.g. "₹20L - ₹35L",
+    "₹8 - 12 LPA", "$60K – $90K / yr", "₹50,000/month" and "₹20L+".
+    Amounts are expanded to whole currency units (20L -> 2000000), and the
+    range is also given as a yearly amount so monthly and hourly pay can be
+    compared with it.
+
+    Args:
+        text (str): The scraped pay string; "N/A" and "Not listed" are accepted.
+
+    Returns:
+        dict: pay_min, pay_max (int or None), pay_currency (ISO code or None),
+              pay_period ('year', 'month' or 'hour', or None) and
+              pay_yearly_min, pay_yearly_max (the range per year).
+    """
+    if not text:
+        return dict(EMPTY_PAY)
+
+    amounts = []
+    units = []
+    for number, unit in AMOUNT_RE.findall(text):
+        amounts.append(float(number.replace(',', '')))
+        units.append(unit.lower() if unit else None)
+    if not amounts:
+        return dict(EMPTY_PAY)
+
+    # "₹8 - 12L": a unit written once applies to the whole range
+    shared_unit = next((unit for unit in reversed(units) if unit), None)
+    values = [
+        int(round(amount * UNIT_MULTIPLIERS.get(unit or shared_unit, 1)))
+        for amount, unit in zip(amounts[:2], units[:2])
+    ]
+
+    currency_match = CURRENCY_RE.search(text)
+    if currency_match:
+        currency = CURRENCY_SYMBOLS[currency_match.group(1).lower()]
+    elif shared_unit in INDIAN_UNITS:
+        currency = 'INR'
+    else:
+        currency = None
+
+    if MONTH_RE.search(text):
+        period = 'month'
+    elif HOUR_RE.search(text):
+        period = 'hour'
+    else:
+        period = 'year'
+
+    pay_min = min(values)
+    pay_max = max(values)
+    if len(values) == 1 and OPEN_ENDED_RE.search(text):
+        pay_max = None
+
+    per_year = PERIODS_PER_YEAR[period]
+    return {
+        'pay_min': pay_min,
+        'pay_max': pay_max,
+        'pay_currency': currency,
+        'pay_period': period,
+        'pay_yearly_min': pay_min * per_year,
+        'pay_yearly_max': pay_max * per_year if pay_max is not None else None,
+    }
+
+
+def parse_experience(text):
+    """
+    Parses a free-text experience string into a range of years.
+
+    Handles e.g. "3 - 6 years", "0-1 yrs", "5+ years", "2 years" and "Fresher".
+
+    Args:
+        text (str): The scraped experience string; "N/A" is accepted.
+
+    Returns:
+        dict: experience_min and experience_max in whole years (int or None).
+    """
+    if not text:
+        return dict(EMPTY_EXPERIENCE)
+    if FRESHER_RE.search(text):
+        return {'experience_min': 0, 'experience_max': 0}
+
+    years = [int(float(value)) for value in YEARS_RE.findall(text)[:2]]
+    if not years:
+        return dict(EMPTY_EXPERIENCE)
+
+    experience_min = min(years)
+    experience_max = max(years)
+    if len(years) == 1 and OPEN_ENDED_RE.search(text):
+        experience_max = None
+
+    return {'experience_min': experience_min, 'experience_max': experience_max}
+
+
+# Tags kept in the stored description HTML; every attribute but a link's http(s)/mailto href is dropped
+ALLOWED_TAGS = {
+    'p', 'br', 'ul', 'ol', 'li', 'strong', 'em', 'b', 'i', 'u', 'a',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'blockquote', 'pre', 'code',
+}
+# Tags dropped together with their content
+DROPPED_TAGS = {
+    'script', 'style', 'noscript', 'iframe', 'object', 'template', 'svg',
+    'head', 'title', 'form', 'select', 'textarea', 'button',
+}
+# Tags that break the plain text into separate lines
+BLOCK_TAGS = {
+    'p', 'br', 'ul', 'ol', 'li', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'blockquote', 'pre',
+    'div', 'section', 'article', 'header', 'footer', 'table', 'tr', 'td', 'th', 'hr',
+}
+# Tags that may not appear inside a <p>
+PARAGRAPH_CLOSERS = {'p', 'ul', 'ol', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'blockquote', 'pre'}
+VOID_TAGS = {'br', 'hr', 'img', 'input', 'meta', 'link', 'wbr', 'source', 'col', 'area', 'base', 'embed'}
+LINK_SCHEMES = ('http://', 'https://', 'mailto:')
+
+SNIPPET_LENGTH = 200
+
+WHITESPACE_RE = re.compile(r'\s+')
+EMPTY_ELEMENT_RE = re.compile(r'<(\w+)>(?:\s|<br>)*</\1>')
+BLOCK_SPACE_RE = re.compile(r'\s*(</?(?:p|ul|ol|li|h[1-6]|blockquote|pre)>|<br>)\s*')
+BLOCK_BREAK_RE = re.compile(r'(?:<br>)*(</?(?:p|ul|ol|li|h[1-6]|blockquote|pre)>)(?:<br>)*')
+BLOCK_HTML_RE = re.compile(r'<(?:p|ul|ol|h[1-6]|blockquote|pre)>')
+
+
+class _DescriptionCleaner(HTMLParser):
+    """Collects the whitelisted markup and the plain text of a description."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.html = []
+        self.text = []
+        self.open = []    # allowed tags open in the output
+        self.dropped = 0  # depth inside DROPPED_TAGS
+        self.pre = 0      # depth inside <pre>
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROPPED_TAGS:
+            self.dropped += 1
+            return
+        if self.dropped:
+            return
+        if tag in BLOCK_TAGS:
+            self.text.append('\n')
+        if tag not in ALLOWED_TAGS:
+            return
+        if tag == 'br':
+            self.html.append('<br>')
+            return
+        if tag in PARAGRAPH_CLOSERS and 'p' in self.open:
+            # As in browsers, a block inside a paragraph ends the paragraph
+            self.handle_endtag('p')
+        if tag == 'a':
+            href = (dict(attrs).get('href') or '').strip()
+            if not href.lower().startswith(LINK_SCHEMES):
+                # Kept as plain text: javascript:, relative and missing links go nowhere safe
+                return
+            self.html.append(f'<a href="{escape(href)}">')
+        else:
+            self.html.append(f'<{tag}>')
+        self.open.append(tag)
+        if tag == 'pre':
+            self.pre += 1
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in DROPPED_TAGS:
+            self.dropped = max(self.dropped - 1, 0)
+            return
+        if self.dropped:
+            return
+        if tag in BLOCK_TAGS:
+            self.text.append('\n')
+        if tag not in self.open:
+            return
+        # Close anything left open inside it, so the output stays well-formed
+        while self.open:
+            closed = self.open.pop()
+            self.html.append(f'</{closed}>')
+            if closed == 'pre':
+                self.pre -= 1
+            if closed == tag:
+                break
+
+    def handle_data(self, data):
+        if self.dropped:
+            return
+        self.text.append(data)
+        if not self.pre:
+            data = WHITESPACE_RE.sub(' ', data)
+        self.html.append(escape(data, quote=False))
+
+    def result(self):
+        self.close()
+        while self.open:
+            self.html.append(f'</{self.open.pop()}>')
+        html = ''.join(self.html)
+        html = BLOCK_SPACE_RE.sub(r'\1', html)
+        html = BLOCK_BREAK_RE.sub(r'\1', html)
+        previous = None
+        while previous != html:
+            previous, html = html, EMPTY_ELEMENT_RE.sub('', html)
+        html = html.strip()
+        if html and not BLOCK_HTML_RE.search(html):
+            html = f'<p>{html}</p>'
+        lines = (WHITESPACE_RE.sub(' ', line).strip() for line in ''.join(self.text).split('\n'))
+        return html, '\n'.join(line for line in lines if line)
+
+
+def clean_description(raw):
+    """
+    Sanitizes a scraped description once, at ingest, so clients never have to.
+
+    Args:
+        raw (str): The description as scraped: a board's HTML fragment or
+            plain text.
+
+    Returns:
+        tuple: (html, text) where html keeps only ALLOWED_TAGS, with no
+               classes, styles or other attributes except safe link hrefs,
+               and text is the plain text, one line per block, for search
+               and similarity.
+    """
+    if not raw:
+        return '', ''
+    cleaner = _DescriptionCleaner()
+    cleaner.feed(raw)
+    return cleaner.result()
+
+
+def make_snippet(text, length=SNIPPET_LENGTH):
+    """Shortens plain text to at most `length` characters at a word boundary, for list views."""
+    text = WHITESPACE_RE.sub(' ', text or '').strip()
+    if len(text) <= length:
+        return text
+    cut = text[:length - 1]
+    if ' ' in cut:
+        cut = cut.rsplit(' ', 1)[0]
+    return cut.rstrip(' ,;:.-') + '…'
+
+
+def build_job(card, now=None):
+    """
+    Turns a raw job card from a source plugin into a jobs_job row.
+
+    Args:
+        card (dict): title, company, location, description, apply_link, tags
+            (list), pay and experience, as scraped.
+        now (datetime, optional): Scrape time; defaults to the current time.
+
+    Returns:
+        dict: The row, with the description sanitized by clean_description()
+              plus its plain text and snippet, parsed pay/experience ranges,
+              scrape timestamps and the dedup fields of
+              dedup.add_dedup_fields().
+    """
+    now = now or datetime.now()
+    description, description_text = clean_description(card['description'])
+    job = {
+        'title': card['title'],
+        'company': card['company'],
+        'location': card['location'],
+        'description': description,
+        'description_text': description_text,
+        'snippet': make_snippet(description_text),
+        'apply_link': card['apply_link'],
+        'tags': json.dumps(card['tags']),
+        'pay': card['pay'],
+        'experience': card['experience'],
+        **parse_pay(card['pay']),
+        **parse_experience(card['experience']),
+        'created_at': now,
+        'updated_at': now,
+        'first_seen_at': now,
+        'last_seen_at': now,
+    }
+    return add_dedup_fields(job)
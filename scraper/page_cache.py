@@ -0,0 +1,161 @@
+"""
+Persistent fetch cache for listing pages.
+
+For every page URL the cache remembers the validators the site sent (ETag,
+Last-Modified), a hash of the body and the apply links found on it. The next
+run asks for the page conditionally; on a 304, or a 200 whose body hashes
+the same, the page is not parsed and its jobs are not upserted again. Only
+their last_seen_at is refreshed from the remembered links, so unchanged
+listings are never archived as stale.
+
+Entries older than MAX_AGE are treated as changed, so after an outage long
+enough for archive_stale_jobs to move a page's jobs out of jobs_job, the page
+is parsed and its jobs written back. A page whose remembered jobs are not all
+in jobs_job any more is forgotten, and fetched in full by the next run.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+DEFAULT_PATH = os.environ.get(
+    'SCRAPER_CACHE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'pages.sqlite3')
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    body_hash TEXT NOT NULL,
+    apply_links TEXT NOT NULL,
+    fetched_at TEXT NOT NULL
+)
+"""
+
+# Must not exceed archive_stale_jobs --days (14 by default): an entry older
+# than that may hold jobs that were archived while the scraper was not running
+MAX_AGE = timedelta(days=int(os.environ.get('SCRAPER_CACHE_MAX_AGE_DAYS', 7)))
+
+# Outcomes of PageCache.classify()
+NOT_MODIFIED = 'not_modified'  # 304 from the site
+UNCHANGED = 'unchanged'        # 200 with the same body hash
+CHANGED = 'changed'            # 200 with a new body, or a page not seen before
+
+TOUCH_SQL = "UPDATE jobs_job SET last_seen_at = NOW() WHERE apply_link = ANY(%s);"
+
+
+class PageCache:
+    def __init__(self, path=DEFAULT_PATH, max_age=MAX_AGE):
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Shared by the fetch threads; every access holds the lock
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute(SCHEMA)
+        self.lock = threading.Lock()
+        self.max_age = max_age
+        self.counts = {NOT_MODIFIED: 0, UNCHANGED: 0, CHANGED: 0}
+
+    def _row(self, url):
+        """Returns the stored (etag, last_modified, body_hash, apply_links) of `url`, unless expired."""
+        with self.lock:
+            row = self.db.execute(
+                "SELECT etag, last_modified, body_hash, apply_links, fetched_at FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None or datetime.now() - datetime.fromisoformat(row[4]) > self.max_age:
+            return None
+        return row[:4]
+
+    def conditional_headers(self, url):
+        """Returns the If-None-Match / If-Modified-Since headers for `url`, if any."""
+        row = self._row(url)
+        headers = {}
+        if row and row[0]:
+            headers['If-None-Match'] = row[0]
+        if row and row[1]:
+            headers['If-Modified-Since'] = row[1]
+        return headers
+
+    def classify(self, url, response):
+        """
+        Decides whether the page behind `response` changed since it was last
+        stored.
+
+        Returns:
+            tuple: (outcome, apply_links), where apply_links are the links
+                   remembered for an unchanged page and None otherwise.
+        """
+        row = self._row(url)
+        if row is not None and (
+            response.status_code == 304 or hashlib.sha256(response.content).hexdigest() == row[2]
+        ):
+            outcome = NOT_MODIFIED if response.status_code == 304 else UNCHANGED
+            links = json.loads(row[3])
+        else:
+            outcome, links = CHANGED, None
+        with self.lock:
+            self.counts[outcome] += 1
+        return outcome, links
+
+    def store(self, url, response, apply_links):
+        """
+        Remembers a changed page. Call it only once the page's jobs are
+        committed, so a failed write is retried on the next run.
+        """
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO pages (url, etag, last_modified, body_hash, apply_links, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    url,
+                    response.headers.get('ETag'),
+                    response.headers.get('Last-Modified'),
+                    hashlib.sha256(response.content).hexdigest(),
+                    json.dumps(list(apply_links)),
+                    datetime.now().isoformat(),
+                ),
+            )
+            self.db.commit()
+
+    def forget(self, url):
+        """Drops the entry of `url`, so the next run fetches and parses it in full."""
+        with self.lock:
+            self.db.execute("DELETE FROM pages WHERE url = ?", (url,))
+            self.db.commit()
+
+    def report(self):
+        """One-line hit-rate summary of this run."""
+        total = sum(self.counts.values())
+        hits = self.counts[NOT_MODIFIED] + self.counts[UNCHANGED]
+        rate = hits / total * 100 if total else 0.0
+        return (
+            f"Page cache: {hits}/{total} hits ({rate:.0f}%): {self.counts[NOT_MODIFIED]} not modified, "
+            f"{self.counts[UNCHANGED]} unchanged, {self.counts[CHANGED]} changed."
+        )
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+def touch_jobs(conn, apply_links):
+    """
+    Marks the jobs on unchanged pages as seen in this run, in place of the
+    skipped upsert.
+
+    Args:
+        conn: An open psycopg2 connection. The update is committed.
+        apply_links (list): Apply links remembered for the unchanged pages.
+
+    Returns:
+        int: Number of jobs touched.
+    """
+    if not apply_links:
+        return 0
+    with conn.cursor() as cursor:
+        cursor.execute(TOUCH_SQL, (list(apply_links),))
+        touched = cursor.rowcount
+    conn.commit()
+    return touched
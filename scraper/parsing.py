@@ -0,0 +1,57 @@
+"""
+HTML parser backends shared by the scrapers.
+
+Both scrapers used to build a full html.parser tree of the whole page. Here
+the tree builder is pluggable (lxml when installed, which is several times
+faster), and a SoupStrainer can limit the tree to the job-card subtrees, so
+navigation, footers and inline scripts are never turned into Python objects.
+
+The extraction code is unchanged on top of either tree; bench_parsers.py
+checks that every backend yields the same job dicts as the reference
+html.parser full-tree parse.
+"""
+import os
+import re
+
+from bs4 import BeautifulSoup, FeatureNotFound, SoupStrainer
+
+REFERENCE_BACKEND = 'html.parser'
+BACKENDS = ('html.parser', 'lxml')
+
+# SCRAPER_PARSER=html.parser restores the old behaviour
+DEFAULT_BACKEND = os.environ.get('SCRAPER_PARSER', 'lxml')
+
+
+def make_soup(content, backend=None, parse_only=None):
+    """
+    Parses `content` with the given tree builder.
+
+    Args:
+        content (bytes or str): The page HTML.
+        backend (str, optional): 'lxml' or 'html.parser'; DEFAULT_BACKEND if omitted.
+            Falls back to html.parser when lxml is not installed.
+        parse_only (SoupStrainer, optional): Only build the matching subtrees.
+
+    Returns:
+        BeautifulSoup: The parsed document.
+    """
+    backend = backend or DEFAULT_BACKEND
+    try:
+        return BeautifulSoup(content, backend, parse_only=parse_only)
+    except FeatureNotFound:
+        return BeautifulSoup(content, REFERENCE_BACKEND, parse_only=parse_only)
+
+
+def card_strainer(tag, class_):
+    """
+    Returns a SoupStrainer keeping only the `tag` elements that find_all(tag,
+    class_=class_) would match, with their subtrees.
+
+    While parsing, the strainer sees the raw class attribute rather than the
+    split class list, so a single class name is matched as a whitespace
+    separated token; a value with spaces must equal the attribute exactly,
+    as it must for find_all().
+    """
+    if ' ' not in class_:
+        class_ = re.compile(rf'(?:^|\s){re.escape(class_)}(?:\s|$)')
+    return SoupStrainer(tag, class_=class_)
@@ -0,0 +1,380 @@
+"""
+Shared fetch -> parse -> normalize -> sink runner for the source plugins.
+
+    python pipeline.py                       # every registered source
+    python pipeline.py --source topstartups  # just one
+
+Each source gets a fetch thread that drives fetch.fetch_all() with its own
+session and rate limit. Changed pages are handed to a process pool, where the
+source's parser and normalize.build_job() run off the GIL, and the parsed
+pages flow through a bounded queue to a single sink in the main thread. The
+sink owns the database connection and writes jobs in batches of
+db.SINK_BATCH_SIZE, so sources overlap their network waits, parsing uses
+every core and memory stays bounded however many pages a run has.
+
+The sink commits every FLUSH_PAGES pages (or db.SINK_BATCH_SIZE jobs),
+bumps the data version after every commit that changed rows, so the API's
+caches and ETags follow the run as it writes, and records each committed
+page in a checkpoint (see checkpoint.py), so a run that stops early keeps
+what it wrote, and `--resume` continues with the
+pages it had not finished. Every run ends with a per-page report, and a
+JSON run report of stage timings and counters (see metrics.py).
+"""
+import argparse
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+from checkpoint import FAILED, OK, UNCHANGED, Checkpoint
+from db import SINK_BATCH_SIZE, bump_data_version, connect, format_counts, upsert_jobs
+from dedup import link_near_duplicates
+from fetch import CircuitBreaker, FetchStats, HostRateLimiter, fetch_all, make_session
+from metrics import DEFAULT_REPORT_PATH, RUN_SECTION, Stats, run_report, write_report
+from normalize import build_job
+from page_cache import CHANGED, PageCache, touch_jobs
+from sources import get_source, load_sources
+
+# Parsed pages waiting for the sink; fetching blocks when it is full
+QUEUE_SIZE = 64
+
+# Pages per sink commit, so a long run writes as it goes
+FLUSH_PAGES = 5
+
+_DONE = object()
+
+
+def parse_page(source_name, content, page):
+    """
+    Parses and normalizes one listing page. Runs in a worker process, so it
+    only takes and returns picklable values.
+
+    Returns:
+        tuple: (jobs, stats): the page's job rows (see normalize.build_job()),
+               and a dict of its parse and normalize seconds and the number
+               of cards found and skipped.
+    """
+    source = get_source(source_name)
+    errors = []
+    started = time.perf_counter()
+    cards = source.parse_cards(content, page, errors)
+    parsed = time.perf_counter()
+    jobs = [build_job(card) for card in cards]
+    return jobs, {
+        'parse': parsed - started,
+        'normalize': time.perf_counter() - parsed,
+        'cards_found': len(cards) + len(errors),
+        'cards_skipped': len(errors),
+    }
+
+
+def _fetch_source(source, executor, page_cache, out, skip=(), breaker=None, stats=None):
+    """
+    Fetches every page of `source` whose URL is not in `skip` and queues one
+    item per page, then _DONE:
+    ('changed', source, page, url, response, future of parse_page()),
+    ('unchanged', source, page, url, None, remembered apply links) or
+    ('failed', source, page, url, None, error).
+    """
+    pages = {url: page for page, url in source.pages() if url not in skip}
+    session = make_session(source.concurrency, stats)
+    limiter = HostRateLimiter(rate=source.rate, burst=source.burst)
+    try:
+        for url, response, error in fetch_all(
+            pages, session=session, concurrency=source.concurrency, limiter=limiter, page_cache=page_cache,
+            breaker=breaker, stats=stats,
+        ):
+            page = pages[url]
+            if error is not None:
+                print(f"[{source.name}] Error fetching page {page}: {error}")
+                out.put(('failed', source, page, url, None, error))
+                continue
+            if page_cache:
+                outcome, links = page_cache.classify(url, response)
+                if outcome != CHANGED:
+                    print(f"[{source.name}] Page {page} {outcome.replace('_', ' ')}, skipping.")
+                    out.put(('unchanged', source, page, url, None, links))
+                    continue
+            print(f"[{source.name}] Fetched page {page}")
+            future = executor.submit(parse_page, source.name, response.content, page)
+            out.put(('changed', source, page, url, response, future))
+    except Exception as e:
+        print(f"[{source.name}] Fetching stopped: {e}")
+    finally:
+        session.close()
+        out.put(_DONE)
+
+
+class _Sink:
+    """
+    Batches parsed jobs into upsert_jobs(), committing every `flush_pages`
+    pages or `batch_size` jobs, and records every finished page in the
+    checkpoint. Counts go to each source's Stats in `stats`, and database
+    time to its RUN_SECTION.
+    """
+
+    def __init__(self, conn, page_cache, checkpoint, batch_size, flush_pages, stats):
+        self.conn = conn
+        self.page_cache = page_cache
+        self.checkpoint = checkpoint
+        self.batch_size = batch_size
+        self.flush_pages = flush_pages
+        self.jobs = []
+        self.pages = []  # (source, page, url, response, apply links) of the buffered jobs
+        self.changed = False  # rows committed since the last data version bump
+        self.stats = stats
+        self.run_stats = stats[RUN_SECTION]
+
+    def add_page(self, source, page, url, response, jobs):
+        self.jobs.extend(jobs)
+        self.pages.append((source, page, url, response, [job['apply_link'] for job in jobs]))
+        if len(self.jobs) >= self.batch_size or len(self.pages) >= self.flush_pages:
+            self.flush()
+
+    def touch(self, source, page, url, links):
+        with self.run_stats.timer('db_write'):
+            touched = touch_jobs(self.conn, links)
+        self.stats[source.name].add('jobs_touched', touched)
+        if touched < len(set(links)) and self.page_cache:
+            # Some of the page's jobs were archived or removed since it was stored
+            print(f"[{source.name}] Page {page}: {len(set(links)) - touched} remembered jobs missing, "
+                  "it will be parsed again next run.")
+            self.page_cache.forget(url)
+        self.checkpoint.record(source.name, url, page, UNCHANGED, len(links))
+
+    def fail(self, source, page, url, error):
+        self.stats[source.name].add('pages_failed')
+        self.checkpoint.record(source.name, url, page, FAILED, error=error)
+
+    def bump_version(self):
+        """Bumps the data version if rows changed since the last bump."""
+        if self.changed:
+            bump_data_version(self.conn)
+            self.changed = False
+
+    def flush(self):
+        """Writes the buffered pages; if that fails they are recorded as failed."""
+        if not self.pages:
+            return
+        pages, jobs = self.pages, self.jobs
+        self.pages, self.jobs = [], []
+        try:
+            with self.run_stats.timer('db_write'):
+                counts = upsert_jobs(self.conn, jobs, batch_size=self.batch_size)
+            print(f"Upserted {len(jobs)} jobs from {len(pages)} pages: {format_counts(counts)}.")
+            for key in ('inserted', 'updated', 'unchanged'):
+                self.run_stats.add(f"rows_{key}", counts[key])
+            # Unchanged rows were not rewritten, so only modified ones need linking
+            if counts['modified_links']:
+                self.changed = True
+                with self.run_stats.timer('db_link'):
+                    duplicates = link_near_duplicates(self.conn, counts['modified_links'])
+                self.run_stats.add('duplicates_linked', duplicates)
+                print(f"Linked {duplicates} near-duplicate jobs to their canonical job.")
+        except Exception as e:
+            print(f"Error writing {len(jobs)} jobs to the database: {e}")
+            for source, page, url, _, _ in pages:
+                self.fail(source, page, url, e)
+            return
+        # Only remember the pages once their jobs are written
+        for source, page, url, response, links in pages:
+            stats = self.stats[source.name]
+            stats.add('pages_written')
+            stats.add('jobs_written', len(links))
+            self.checkpoint.record(source.name, url, page, OK, len(links))
+            if self.page_cache:
+                self.page_cache.store(url, response, links)
+        try:
+            self.bump_version()
+        except Exception as e:
+            # Retried after the next commit, or at the end of the run
+            print(f"Error bumping the data version: {e}")
+
+    def report(self):
+        for name, stats in sorted(self.stats.items()):
+            if name == RUN_SECTION:
+                continue
+            counts = stats.counts
+            print(
+                f"[{name}] {counts['pages_written']} pages written, {counts['jobs_written']} jobs written, "
+                f"{counts['jobs_touched']} jobs touched, {counts['pages_failed']} pages failed."
+            )
+
+
+def stream(sources, executor, page_cache=None, skip=None, breaker=None, fetch_stats=None, queue_size=QUEUE_SIZE):
+    """
+    Fetches the pages of `sources` concurrently, one thread per source, and
+    yields their items (see _fetch_source()) in arrival order. Changed pages
+    are parsed on `executor`, so their value is a future of the jobs.
+
+    Args:
+        sources (list): Source instances.
+        executor (concurrent.futures.Executor): Runs parse_page().
+        page_cache (PageCache, optional): Classifies pages as changed or not.
+        skip (dict, optional): Source name -> URLs not to fetch.
+        breaker (CircuitBreaker, optional): Shared by all sources, so sources
+            that share a host share its circuit.
+        fetch_stats (dict, optional): Source name -> FetchStats.
+        queue_size (int, optional): Pages in flight; fetching blocks beyond it.
+    """
+    skip = skip or {}
+    breaker = breaker or CircuitBreaker()
+    fetch_stats = fetch_stats or {}
+    pages = queue.Queue(maxsize=queue_size)
+    fetchers = [
+        threading.Thread(
+            target=_fetch_source,
+            args=(
+                source, executor, page_cache, pages, skip.get(source.name, ()),
+                breaker, fetch_stats.get(source.name),
+            ),
+            name=f"fetch-{source.name}",
+            daemon=True,
+        )
+        for source in sources
+    ]
+    for fetcher in fetchers:
+        fetcher.start()
+
+    running = len(fetchers)
+    while running:
+        item = pages.get()
+        if item is _DONE:
+            running -= 1
+            continue
+        yield item
+
+
+def run(
+    sources, use_cache=True, workers=None, batch_size=SINK_BATCH_SIZE, queue_size=QUEUE_SIZE,
+    flush_pages=FLUSH_PAGES, resume=False, dsn=None, report_path=DEFAULT_REPORT_PATH, prometheus_path=None,
+):
+    """
+    Scrapes `sources` concurrently into jobs_job.
+
+    Args:
+        sources (list): Source instances, or names of registered sources.
+        use_cache (bool, optional): Skip pages unchanged since the last run (see page_cache.py).
+        workers (int, optional): Parser processes; defaults to the CPU count.
+        batch_size (int, optional): Most jobs per upsert transaction.
+        queue_size (int, optional): Pages in flight between fetching and the sink.
+        flush_pages (int, optional): Most pages per upsert transaction.
+        resume (bool, optional): Continue the last unfinished run (see checkpoint.py),
+            skipping the pages it completed.
+        dsn (str, optional): Database to write to, instead of the DB_* settings.
+        report_path (str, optional): Where to write the JSON run report.
+        prometheus_path (str, optional): Also write the report in the Prometheus
+            text format there (e.g. into node_exporter's textfile directory).
+
+    Returns:
+        list: (source name, page, error) of the pages that failed.
+    """
+    started_at = datetime.now()
+    sources = [get_source(source) if isinstance(source, str) else source for source in sources]
+    try:
+        conn = connect(dsn)
+    except Exception as e:
+        print(f"Error connecting to the database: {e}")
+        return [(source.name, None, e) for source in sources]
+
+    checkpoint = Checkpoint(resume=resume)
+    if checkpoint.resumed:
+        print(f"Resuming run {checkpoint.run_id} from {checkpoint.state['started_at']}.")
+    page_cache = PageCache() if use_cache else None
+    stats = {source.name: Stats() for source in sources}
+    stats[RUN_SECTION] = Stats()
+    sink = _Sink(conn, page_cache, checkpoint, batch_size, flush_pages, stats)
+    fetch_stats = {source.name: FetchStats() for source in sources}
+    finished = False
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+            skip = {source.name: checkpoint.completed(source.name) for source in sources}
+            for kind, source, page, url, response, value in stream(
+                sources, executor, page_cache, skip, fetch_stats=fetch_stats, queue_size=queue_size
+            ):
+                try:
+                    if kind == 'changed':
+                        jobs, page_stats = value.result()
+                        source_stats = stats[source.name]
+                        source_stats.observe('parse', page_stats['parse'])
+                        source_stats.observe('normalize', page_stats['normalize'])
+                        source_stats.add('cards_found', page_stats['cards_found'])
+                        source_stats.add('cards_skipped', page_stats['cards_skipped'])
+                        sink.add_page(source, page, url, response, jobs)
+                    elif kind == 'unchanged':
+                        sink.touch(source, page, url, value)
+                    else:
+                        sink.fail(source, page, url, value)
+                except Exception as e:
+                    print(f"[{source.name}] Error processing page {page}: {e}")
+                    sink.fail(source, page, url, e)
+            sink.flush()
+        finished = True
+    except Exception as e:
+        print(f"Error writing jobs to the database: {e}")
+    finally:
+        # Rows committed before a crash or an interrupt must not be hidden by stale caches
+        try:
+            conn.rollback()
+            sink.bump_version()
+        except Exception as e:
+            print(f"Error bumping the data version: {e}")
+        print(checkpoint.report())
+        sink.report()
+        for name, source_fetch_stats in sorted(fetch_stats.items()):
+            print(f"[{name}] Fetch: {source_fetch_stats.report()}.")
+        if page_cache:
+            print(page_cache.report())
+            page_cache.close()
+        conn.close()
+        print("Successfully closed the database connection.")
+
+    for name, source_fetch_stats in fetch_stats.items():
+        stats[name].merge(source_fetch_stats)
+    pages = {}
+    for name, entries in checkpoint.state['sources'].items():
+        for entry in entries.values():
+            outcomes = pages.setdefault(name, {})
+            outcomes[entry['status']] = outcomes.get(entry['status'], 0) + 1
+    try:
+        write_report(
+            run_report(checkpoint.run_id, started_at, datetime.now(), stats, pages), report_path, prometheus_path
+        )
+        print(f"Run report written to {report_path}.")
+    except OSError as e:
+        print(f"Error writing the run report: {e}")
+
+    failed = checkpoint.failed()
+    if failed:
+        print(f"{len(failed)} pages failed; rerun with --resume to retry them.")
+    # An interrupted run keeps its checkpoint even if nothing failed yet
+    if finished:
+        checkpoint.finish()
+    return failed
+
+
+if __name__ == "__main__":
+    # Load environment variables from .env file
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Scrape the registered job boards into jobs_job.")
+    parser.add_argument(
+        '--source', action='append', choices=sorted(load_sources()),
+        help="Source to scrape; repeat for several. Defaults to all.",
+    )
+    parser.add_argument('--no-cache', action='store_true', help="Refetch and re-ingest every page.")
+    parser.add_argument('--workers', type=int, default=None, help="Parser processes (default: CPU count).")
+    parser.add_argument('--resume', action='store_true', help="Continue the last unfinished run.")
+    parser.add_argument('--report', default=DEFAULT_REPORT_PATH, help="JSON run report path.")
+    parser.add_argument('--prometheus', default=None, help="Also write the run report in Prometheus text format here.")
+    args = parser.parse_args()
+    failed = run(
+        args.source or sorted(load_sources()), use_cache=not args.no_cache, workers=args.workers, resume=args.resume,
+        report_path=args.report, prometheus_path=args.prometheus,
+    )
+    sys.exit(1 if failed else 0)
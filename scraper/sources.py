@@ -0,0 +1,91 @@
+"""
+Job-board plugins.
+
+A source only knows its own site: which listing pages to fetch and how to
+turn one page into raw job cards. Fetching, rate limiting, caching,
+normalization and the database write are shared (see pipeline.py), so adding
+a board means writing a Source subclass with its parser and registering it:
+
+    @register
+    class ExampleSource(Source):
+        name = 'example'
+
+        def pages(self):
+            yield 1, "https://example.com/jobs?page=1"
+
+        def parse_cards(self, content, page, errors=None):
+            return [{'title': ..., 'company': ..., ...}]
+
+and listing its module in SOURCE_MODULES.
+"""
+import importlib
+
+from fetch import DEFAULT_BURST, DEFAULT_CONCURRENCY, DEFAULT_RATE
+
+# Modules whose import registers the built-in sources
+SOURCE_MODULES = ('cutshort_scraper', 'topstartups_scraper')
+
+# Keys of the raw card dicts returned by Source.parse_cards()
+CARD_FIELDS = ('title', 'company', 'location', 'description', 'apply_link', 'tags', 'pay', 'experience')
+
+SOURCES = {}
+
+
+class Source:
+    """
+    Base class of job-board plugins.
+
+    Attributes:
+        name (str): Registry key, used on the command line.
+        concurrency (int): Page requests in flight for this source.
+        rate (float): Page requests per second for this source's host.
+        burst (int): Requests the rate limiter lets through back to back.
+    """
+    name = None
+    concurrency = DEFAULT_CONCURRENCY
+    rate = DEFAULT_RATE
+    burst = DEFAULT_BURST
+
+    def pages(self):
+        """Yields (page key, url) for every listing page of one run."""
+        raise NotImplementedError
+
+    def parse_cards(self, content, page, errors=None):
+        """
+        Extracts the job cards of one listing page. Called in a parser
+        process on a fresh instance (see pipeline.parse_page()), so it must
+        not depend on constructor arguments.
+
+        Args:
+            content (bytes): The page HTML.
+            page: The page key yielded by pages(), for log messages.
+            errors (list, optional): Collects the error of every card that
+                could not be parsed and was skipped.
+
+        Returns:
+            list: Dicts with CARD_FIELDS; tags is a list of strings.
+        """
+        raise NotImplementedError
+
+
+def register(cls):
+    """Class decorator adding a Source subclass to the registry."""
+    if not cls.name:
+        raise ValueError(f"{cls.__name__} has no name")
+    SOURCES[cls.name] = cls
+    return cls
+
+
+def load_sources():
+    """Imports the built-in source modules and returns the registry."""
+    for module in SOURCE_MODULES:
+        importlib.import_module(module)
+    return SOURCES
+
+
+def get_source(name):
+    """Returns a new instance of the registered source `name`."""
+    sources = load_sources()
+    if name not in sources:
+        raise KeyError(f"Unknown source {name!r}; available: {', '.join(sorted(sources))}")
+    return sources[name]()
@@ -0,0 +1,235 @@
+"""
+Local stand-in for the job boards, for exercising fetching offline.
+
+The server answers every page of a source with the synthetic pages in
+fixtures/, under /<source name>/<original path and query>, after an
+optional latency, and can inject failures: a chosen share of the URLs fail their first requests with an error
+status (optionally with Retry-After) or by hanging past the client's read
+timeout.
+
+    python stub_server.py --port 8765 --failing 0.3 --status 503   # serve until Ctrl-C
+    python stub_server.py --drill                                  # run the failure drills
+
+The drills fetch every page of every registered source through
+fetch.fetch_all() against the stub under several failure scenarios, check
+that retries recover every page (or that the circuit breaker cuts a dead
+host short), and exit non-zero if one of them does not hold.
+"""
+import argparse
+import hashlib
+import http.server
+import os
+import sys
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+from fetch import CircuitBreaker, FetchStats, HostRateLimiter, RetryPolicy, fetch_all, make_session
+from sources import load_sources
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# Pages served for each source; paginated sources cycle through theirs by ?page=
+FIXTURES = {
+    'cutshort': ['cutshort_jobs.html'],
+    'topstartups': ['topstartups_page1.html', 'topstartups_page2.html'],
+}
+
+
+class StubServer:
+    """
+    Threaded HTTP server on localhost serving FIXTURES, with failure injection.
+
+    Args:
+        port (int, optional): 0 picks a free port.
+        failing (float, optional): Share of URLs that fail, chosen by a hash of the URL.
+        fail_first (int, optional): Requests of a failing URL that fail before it recovers.
+        status (int, optional): Status of the injected failures.
+        retry_after (str, optional): Retry-After header sent with them.
+        hang (float, optional): If set, failures hang for this many seconds and
+            then answer normally, instead of sending `status`.
+        latency (float, optional): Seconds every response is delayed by.
+    """
+
+    def __init__(self, port=0, failing=0.0, fail_first=1, status=503, retry_after=None, hang=None, latency=0.0):
+        self.failing = failing
+        self.fail_first = fail_first
+        self.status = status
+        self.retry_after = retry_after
+        self.hang = hang
+        self.latency = latency
+        self.attempts = {}
+        self.lock = threading.Lock()
+        self.httpd = http.server.ThreadingHTTPServer(('127.0.0.1', port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.stub = self
+        self.thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def should_fail(self, path):
+        """Counts a request for `path` and says whether to fail it."""
+        with self.lock:
+            attempt = self.attempts[path] = self.attempts.get(path, 0) + 1
+        share = int(hashlib.md5(path.encode()).hexdigest()[:8], 16) / 0xFFFFFFFF
+        return share < self.failing and attempt <= self.fail_first
+
+    def fixture(self, path):
+        parts = urlsplit(path)
+        source = parts.path.strip('/').split('/')[0]
+        names = FIXTURES.get(source)
+        if not names:
+            return None
+        page = parse_qs(parts.query).get('page', ['1'])[0]
+        index = int(page) - 1 if page.isdigit() and int(page) > 0 else 0
+        return os.path.join(FIXTURES_DIR, names[index % len(names)])
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        stub = self.server.stub
+        if stub.latency:
+            time.sleep(stub.latency)
+        if stub.should_fail(self.path):
+            if stub.hang is None:
+                self.send_response(stub.status)
+                if stub.retry_after is not None:
+                    self.send_header('Retry-After', stub.retry_after)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            time.sleep(stub.hang)
+        path = stub.fixture(self.path)
+        if path is None:
+            self.send_error(404)
+            return
+        with open(path, 'rb') as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client timed out on a hung response and went away
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubbedSource:
+    """Wraps a Source so its pages are fetched from a StubServer at `base_url`."""
+
+    def __init__(self, source, base_url):
+        self.source = source
+        self.base_url = base_url
+
+    def __getattr__(self, name):
+        return getattr(self.source, name)
+
+    def pages(self):
+        for page, url in self.source.pages():
+            parts = urlsplit(url)
+            query = f"?{parts.query}" if parts.query else ''
+            yield page, f"{self.base_url}/{self.source.name}{parts.path}{query}"
+
+
+# name, StubServer options, fetch options, check of (fetched, pages, stats counts)
+DRILLS = [
+    ('clean', {}, {}, lambda ok, total, counts: ok == total and counts['retries'] == 0),
+    (
+        'flaky 503',
+        {'failing': 0.3, 'fail_first': 2, 'status': 503},
+        {},
+        lambda ok, total, counts: ok == total and counts['retries'] > 0,
+    ),
+    (
+        '429 + Retry-After',
+        {'failing': 0.2, 'fail_first': 1, 'status': 429, 'retry_after': '1'},
+        {},
+        lambda ok, total, counts: ok == total and counts['status_429'] > 0,
+    ),
+    (
+        'hung reads',
+        {'failing': 0.2, 'fail_first': 1, 'hang': 2.0},
+        {'timeout': (1, 0.5)},
+        lambda ok, total, counts: ok == total and counts['timeouts'] > 0,
+    ),
+    (
+        'host down',
+        {'failing': 1.0, 'fail_first': 10 ** 6, 'status': 503},
+        {},
+        lambda ok, total, counts: ok == 0 and counts['short_circuited'] > 0,
+    ),
+]
+
+
+def run_drills(rate=50.0, concurrency=4):
+    """Runs DRILLS and returns True if every check held."""
+    # Short waits so the drills take seconds; the logic is the production one
+    retry = RetryPolicy(backoff=0.05, max_backoff=1.0)
+    passed = True
+    print(f"{'drill':<18} {'pages':>9} {'seconds':>8}  fetch stats")
+    for name, server_options, fetch_options, check in DRILLS:
+        with StubServer(**server_options) as stub:
+            urls = [
+                url for source in load_sources().values()
+                for _, url in StubbedSource(source(), stub.url).pages()
+            ]
+            stats = FetchStats()
+            started = time.perf_counter()
+            ok = sum(
+                1 for _, response, _ in fetch_all(
+                    urls, session=make_session(concurrency), concurrency=concurrency,
+                    limiter=HostRateLimiter(rate=rate, burst=concurrency), retry=retry,
+                    breaker=CircuitBreaker(), stats=stats, **fetch_options,
+                )
+                if response is not None
+            )
+            elapsed = time.perf_counter() - started
+        held = check(ok, len(urls), stats.counts)
+        passed = passed and held
+        print(f"{name:<18} {ok:>4}/{len(urls):<4} {elapsed:>8.2f}  {stats.report()}{'' if held else '  FAILED'}")
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the fixture job-board pages with injected failures.")
+    parser.add_argument('--drill', action='store_true', help="Run the failure drills against the fetch layer.")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--failing', type=float, default=0.0, help="Share of URLs that fail.")
+    parser.add_argument('--fail-first', type=int, default=1, help="Failed requests per failing URL.")
+    parser.add_argument('--status', type=int, default=503)
+    parser.add_argument('--retry-after', default=None)
+    parser.add_argument('--hang', type=float, default=None, help="Hang this many seconds instead of failing.")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds every response is delayed by.")
+    args = parser.parse_args()
+
+    if args.drill:
+        sys.exit(0 if run_drills() else 1)
+
+    with StubServer(
+        args.port, args.failing, args.fail_first, args.status, args.retry_after, args.hang, args.latency
+    ) as stub:
+        print(f"Serving {', '.join(sorted(FIXTURES))} at {stub.url}/<source>/... (Ctrl-C to stop)")
+        try:
+            stub.thread.join()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()